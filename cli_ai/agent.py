@@ -6,16 +6,20 @@ returns a clean command string.
 """
 
 import logging
+import re
 from typing import Optional
 
 from .prompts import build_system_prompt
 from .tools import TOOL_SCHEMAS, execute_tool
-from .llm.manager import LLMManager
+from .llm.manager import get_manager
 from .llm.provider_factory import LLMType
 from . import config_file
 
 logger = logging.getLogger(__name__)
 
+# Tool-call markup some models leak into plain text responses
+_FUNCTION_TAG_RE = re.compile(r"<function=[^>]*>\{[^}]*\}</function>\s*")
+
 
 async def process_query(
     query: str,
@@ -54,9 +58,8 @@ async def process_query(
     async def tool_handler(name: str, args: dict) -> str:
         return await execute_tool(name, args, cwd)
 
-    # Initialize LLM manager
-    manager = LLMManager()
-    await manager.initialize()
+    # Shared LLM manager (initialized once per process)
+    manager = await get_manager()
 
     try:
         result = await manager.generate(
@@ -75,8 +78,6 @@ async def process_query(
     except Exception as e:
         logger.error(f"Agent error: {e}")
         return f"# Error: {e}"
-    finally:
-        await manager.cleanup()
 
 
 def _clean_command(text: str) -> str:
@@ -84,22 +85,29 @@ def _clean_command(text: str) -> str:
     Clean LLM output to ensure it's a bare command.
     Strip markdown, backticks, function call artifacts, explanations.
     """
-    import re
-
     text = text.strip()
 
-    # Remove code block wrappers
+    # Common case: a single bare line with nothing to strip
+    if ("\n" not in text and "<function=" not in text
+            and not text.startswith(("`", "$ "))):
+        return text
+
+    # Remove code block wrappers (drop the first and last lines)
     if text.startswith("```") and text.endswith("```"):
-        lines = text.split("\n")
-        lines = lines[1:-1] if len(lines) > 2 else lines
-        text = "\n".join(lines).strip()
+        first_nl = text.find("\n")
+        last_nl = text.rfind("\n")
+        if first_nl != last_nl:
+            text = text[first_nl + 1 : last_nl].strip()
 
     # Remove single-line backtick wrapping
-    if text.startswith("`") and text.endswith("`") and "\n" not in text:
+    multiline = "\n" in text
+    if not multiline and text.startswith("`") and text.endswith("`"):
         text = text.strip("`")
 
     # Remove function call artifacts (e.g. <function=name>{...}</function>)
-    text = re.sub(r"<function=[^>]*>\{[^}]*\}</function>\s*", "", text)
+    if "<function=" in text:
+        text = _FUNCTION_TAG_RE.sub("", text)
+        multiline = "\n" in text
 
     # Remove leading "$ " prompt markers
     if text.startswith("$ "):
@@ -107,11 +115,12 @@ def _clean_command(text: str) -> str:
 
     # If multi-line, take the last non-empty line that looks like a command
     # (LLM sometimes prepends explanation before the actual command)
-    lines = [l.strip() for l in text.strip().split("\n") if l.strip()]
-    if len(lines) > 1:
-        # Filter out lines that look like explanations (start with letters and contain spaces but no command chars)
-        cmd_lines = [l for l in lines if not l.startswith("#") or l == lines[-1]]
-        if cmd_lines:
-            text = cmd_lines[-1]
+    if multiline:
+        lines = [l.strip() for l in text.strip().split("\n") if l.strip()]
+        if len(lines) > 1:
+            # Filter out lines that look like explanations (start with letters and contain spaces but no command chars)
+            cmd_lines = [l for l in lines if not l.startswith("#") or l == lines[-1]]
+            if cmd_lines:
+                text = cmd_lines[-1]
 
     return text.strip()
@@ -3,32 +3,41 @@ Optional config file support for CLI AI.
 
 Reads ~/.config/cli-ai/config.toml if it exists.
 Missing config or invalid values fall back to defaults.
+
+The parsed TOML is pickled next to the config file and reused as long as
+the config's mtime and size are unchanged, so most runs skip parsing.
 """
 
 import logging
+import os
+import pickle
 import sys
-import tomllib
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 logger = logging.getLogger(__name__)
 
 CONFIG_PATH = Path.home() / ".config" / "cli-ai" / "config.toml"
+PARSE_CACHE_NAME = "config.cache.pkl"
 
 # Defaults (match existing behavior)
-DEFAULTS: Dict[str, Any] = {
+DEFAULTS: Mapping[str, Any] = MappingProxyType({
     "provider": "groq",
     "model": None,  # None means use provider default
     "history_lines": 20,
     "max_iterations": 5,
     "max_file_lines": 500,
+    "cache": True,
     "debug": False,
-}
+})
 
 # Valid provider names
-VALID_PROVIDERS = {"groq", "cerebras"}
+VALID_PROVIDERS = frozenset({"groq", "cerebras"})
 
 _config: Dict[str, Any] = {}
+# Read-only view of _config handed out to callers
+_view: Mapping[str, Any] = MappingProxyType(_config)
 _loaded = False
 
 
@@ -45,31 +54,77 @@ def _validate_int(value: Any, key: str, minimum: int = 1) -> int | None:
         return None
 
 
-def load_config() -> Dict[str, Any]:
+def _parse_toml(path: Path) -> Dict[str, Any]:
+    """Parse a TOML file with rtoml (Rust) when installed, else tomllib."""
+    try:
+        import rtoml
+    except ImportError:
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+
+    with open(path, encoding="utf-8") as f:
+        return rtoml.load(f)
+
+
+def _read_toml(path: Path) -> Dict[str, Any]:
+    """
+    Parse a TOML file, reusing the pickled result when it is unchanged.
+
+    Raises:
+        FileNotFoundError: If the config file does not exist
+        Exception: Any TOML parse error
+    """
+    st = os.stat(path)
+    stamp = (str(path), st.st_mtime_ns, st.st_size)
+    cache_path = path.with_name(PARSE_CACHE_NAME)
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, cached_data = pickle.load(f)
+        if cached_stamp == stamp:
+            return cached_data
+    except Exception:
+        pass  # missing or stale cache, parse below
+
+    data = _parse_toml(path)
+
+    try:
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((stamp, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        logger.debug("Could not write config parse cache: %s", e)
+
+    return data
+
+
+def load_config() -> Mapping[str, Any]:
     """
     Load config from TOML file, merging with defaults.
 
-    Returns a dict with keys: provider, model, history_lines,
-    max_iterations, max_file_lines.
+    Returns a read-only mapping with keys: provider, model, history_lines,
+    max_iterations, max_file_lines, cache, debug.
     """
-    global _config, _loaded
+    global _config, _view, _loaded
 
     if _loaded:
-        return _config
+        return _view
 
     _config = dict(DEFAULTS)
+    _view = MappingProxyType(_config)
     _loaded = True
 
-    if not CONFIG_PATH.exists():
-        logger.debug("No config file at %s, using defaults", CONFIG_PATH)
-        return _config
-
     try:
-        with open(CONFIG_PATH, "rb") as f:
-            data = tomllib.load(f)
+        data = _read_toml(CONFIG_PATH)
+    except FileNotFoundError:
+        logger.debug("No config file at %s, using defaults", CONFIG_PATH)
+        return _view
     except Exception as e:
         print(f"cli-ai: error reading config: {e}", file=sys.stderr)
-        return _config
+        return _view
 
     # [provider] section
     provider_section = data.get("provider", {})
@@ -112,6 +167,13 @@ def load_config() -> Dict[str, Any]:
             if val is not None:
                 _config["max_file_lines"] = val
 
+    # [cache] section
+    cache_section = data.get("cache", {})
+    if isinstance(cache_section, dict):
+        enabled = cache_section.get("enabled")
+        if isinstance(enabled, bool):
+            _config["cache"] = enabled
+
     # [debug] section
     debug_section = data.get("debug", {})
     if isinstance(debug_section, dict):
@@ -120,17 +182,20 @@ def load_config() -> Dict[str, Any]:
             _config["debug"] = enabled
 
     logger.debug("Loaded config: %s", _config)
-    return _config
+    return _view
 
 
 def get(key: str) -> Any:
     """Get a config value by key."""
-    cfg = load_config()
-    return cfg.get(key, DEFAULTS.get(key))
+    try:
+        return load_config()[key]
+    except KeyError:
+        return None
 
 
 def reset():
     """Reset loaded config (for testing)."""
-    global _config, _loaded
+    global _config, _view, _loaded
     _config = {}
+    _view = MappingProxyType(_config)
     _loaded = False
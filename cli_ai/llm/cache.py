@@ -0,0 +1,130 @@
+"""
+On-disk LLM response cache for CLI AI.
+
+Stores provider responses in a small JSON file keyed by a hash of
+(model, messages, tool names, temperature, max_tokens, json mode), so repeating a query in the
+same context skips the network round-trip.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = Path.home() / ".local" / "share" / "cli-ai" / "llm_cache.json"
+MAX_ENTRIES = 512
+TTL_SECONDS = 7 * 24 * 3600  # 7 days
+
+
+class LLMCache:
+    """
+    Content-addressed response cache with LRU eviction and TTL.
+
+    Entries are kept in insertion order; a hit moves the entry to the end,
+    so the first entry is always the least recently used.
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_FILE,
+        max_entries: int = MAX_ENTRIES,
+        ttl: float = TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+    ) -> str:
+        """Build the cache key for a request."""
+        tool_names = sorted(t.get("name", "") for t in tools) if tools else []
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "tools": tool_names,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "json_mode": json_mode,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the cache file once per process."""
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                self._entries = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                self._entries = {}
+            except Exception as e:
+                logger.debug(f"Ignoring unreadable LLM cache: {e}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        """Atomically write the cache file. Failures are never fatal."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp name so concurrent processes never share a file
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.path.parent, suffix=".tmp", delete=False
+            ) as f:
+                tmp = f.name
+                json.dump(self._entries, f)
+            try:
+                os.replace(tmp, self.path)
+            except Exception:
+                os.unlink(tmp)
+                raise
+        except Exception as e:
+            logger.debug(f"Failed to write LLM cache: {e}")
+
+    def get(self, key: str) -> Any:
+        """
+        Return the cached value for key, or None on miss or expiry.
+
+        Expired entries are dropped and hits become most recently used;
+        either change is persisted so the LRU order survives the process.
+        """
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.get("ts", 0) > self.ttl:
+            del entries[key]
+            self._save()
+            return None
+        if next(reversed(entries)) != key:
+            # Mark as most recently used; skip the write if it already is
+            del entries[key]
+            entries[key] = entry
+            self._save()
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value and persist the cache, evicting the oldest entries."""
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = {"ts": time.time(), "value": value}
+        while len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+        self._save()
@@ -3,14 +3,16 @@ Configuration for CLI AI LLM services.
 
 Loads API keys and model settings from .env file,
 with optional overrides from ~/.config/cli-ai/config.toml.
+
+Settings are resolved on first attribute access (PEP 562 module
+__getattr__), so importing this module does not touch the filesystem or
+import python-dotenv.
 """
 
 import os
 import logging
 from pathlib import Path
-from dotenv import load_dotenv
-
-from .. import config_file
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -20,28 +22,61 @@ _env_paths = [
     Path.cwd() / ".env",
 ]
 
-_env_loaded = False
-for _env_path in _env_paths:
-    if _env_path.exists():
-        load_dotenv(dotenv_path=_env_path)
-        logger.debug(f"Loaded .env from {_env_path}")
-        _env_loaded = True
-        break
+_env_checked = False
+
+
+def _load_env_once() -> None:
+    """Load the first .env file found into the environment, once per process."""
+    global _env_checked
+    if _env_checked:
+        return
+    _env_checked = True
+
+    for env_path in _env_paths:
+        if env_path.exists():
+            from dotenv import load_dotenv
+
+            load_dotenv(dotenv_path=env_path)
+            logger.debug(f"Loaded .env from {env_path}")
+            return
 
-if not _env_loaded:
     logger.debug(".env not found; using environment variables if set.")
 
-# API Keys
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-CEREBRAS_API_KEY = os.getenv("CEREBRAS_API_KEY")
 
-# Model defaults — config.toml overrides env vars, which override hardcoded defaults
-_cfg_model = config_file.get("model")
-GROQ_MODEL = _cfg_model or os.getenv("CLI_AI_GROQ_MODEL", "llama-3.3-70b-versatile")
-CEREBRAS_MODEL = os.getenv("CLI_AI_CEREBRAS_MODEL", "llama-3.3-70b")
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    _load_env_once()
+    return os.getenv(name, default)
+
+
+def _config(key: str) -> Any:
+    from .. import config_file
+
+    return config_file.get(key)
+
+
+_SETTINGS: Dict[str, Callable[[], Any]] = {
+    # API Keys
+    "GROQ_API_KEY": lambda: _env("GROQ_API_KEY"),
+    "CEREBRAS_API_KEY": lambda: _env("CEREBRAS_API_KEY"),
+    # Model defaults — config.toml overrides env vars, which override hardcoded defaults
+    "GROQ_MODEL": lambda: _config("model") or _env("CLI_AI_GROQ_MODEL", "llama-3.3-70b-versatile"),
+    "CEREBRAS_MODEL": lambda: _env("CLI_AI_CEREBRAS_MODEL", "llama-3.3-70b"),
+    # Primary provider from config
+    "PRIMARY_PROVIDER": lambda: _config("provider"),
+    # Response cache (see llm/cache.py)
+    "CACHE_ENABLED": lambda: bool(_config("cache")),
+    # Use the OpenAI SDK client instead of direct httpx requests
+    "USE_SDK": lambda: _env("CLI_AI_USE_SDK", "0") == "1",
+    # Timeouts (fast for CLI use)
+    "HTTP_TIMEOUT": lambda: int(_env("CLI_AI_TIMEOUT", "30")),
+}
 
-# Primary provider from config
-PRIMARY_PROVIDER = config_file.get("provider")
 
-# Timeouts (fast for CLI use)
-HTTP_TIMEOUT = int(os.getenv("CLI_AI_TIMEOUT", "30"))
+def __getattr__(name: str) -> Any:
+    """Resolve a setting on first access and cache it as a module global."""
+    resolver = _SETTINGS.get(name)
+    if resolver is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = resolver()
+    globals()[name] = value
+    return value
@@ -4,14 +4,16 @@ Simplified LLM Manager for CLI AI.
 Provides a unified interface for LLM generation with multi-round tool calling.
 """
 
-import json
+import asyncio
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Callable, Union
 
 from .provider_factory import ProviderFactory, LLMType
 from .providers.base_provider import BaseProvider
+from .utils import SIDE_EFFECT_TOOLS, json_dumps
 from . import config
 from .. import config_file
 
@@ -21,29 +23,33 @@ logger = logging.getLogger(__name__)
 _DEBUG_LOG_DIR = Path.home() / ".local" / "share" / "cli-ai"
 _DEBUG_LOG_FILE = _DEBUG_LOG_DIR / "debug.log"
 
+# Sent as a user message before the final, tool-less request
+FINAL_ANSWER_NUDGE = (
+    "You have used all available tool calls. "
+    "Based on the information gathered, provide your final answer now. "
+    "Do NOT call any tools. Return ONLY the shell command."
+)
+
+# Debug flag, read from config once per process
+_DEBUG: Optional[bool] = None
+
 
 def _debug_enabled() -> bool:
-    return bool(config_file.get("debug"))
-
-
-def _debug_log(label: str, data: Any) -> None:
-    """Append a timestamped entry to the debug log file."""
-    if not _debug_enabled():
-        return
-    try:
-        _DEBUG_LOG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(_DEBUG_LOG_FILE, "a") as f:
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            f.write(f"\n{'='*72}\n")
-            f.write(f"[{ts}] {label}\n")
-            f.write(f"{'='*72}\n")
-            if isinstance(data, (dict, list)):
-                f.write(json.dumps(data, indent=2, default=str))
-            else:
-                f.write(str(data))
-            f.write("\n")
-    except Exception:
-        pass  # never break the CLI for debug logging
+    global _DEBUG
+    if _DEBUG is None:
+        _DEBUG = bool(config_file.get("debug"))
+    return _DEBUG
+
+
+def _format_log_entry(ts: float, label: str, data: Any) -> str:
+    """Render one debug log entry."""
+    stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    if isinstance(data, (dict, list)):
+        body = json_dumps(data, indent=True)
+    else:
+        body = str(data)
+    rule = "=" * 72
+    return f"\n{rule}\n[{stamp}] {label}\n{rule}\n{body}\n"
 
 
 class LLMManager:
@@ -53,29 +59,58 @@ class LLMManager:
 
     def __init__(self):
         self.providers: Dict[LLMType, BaseProvider] = {}
+        # Providers are built and initialized on first use
+        self._factories: Dict[LLMType, Callable[[], BaseProvider]] = {}
+        # Debug log writer state (active only when debug is enabled)
+        self._log_q: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
         self._init_providers()
 
     def _init_providers(self):
-        """Initialize available providers from config."""
+        """Register provider factories for the providers configured."""
         if config.GROQ_API_KEY:
-            try:
-                self.providers[LLMType.GROQ] = ProviderFactory.create_provider(
-                    LLMType.GROQ, config.GROQ_API_KEY, config.GROQ_MODEL
-                )
-                logger.debug(f"Created Groq provider: {config.GROQ_MODEL}")
-            except Exception as e:
-                logger.error(f"Failed to create Groq provider: {e}")
+            self._factories[LLMType.GROQ] = lambda: ProviderFactory.create_provider(
+                LLMType.GROQ, config.GROQ_API_KEY, config.GROQ_MODEL
+            )
         else:
             logger.warning("GROQ_API_KEY not set.")
 
     async def initialize(self):
-        """Initialize all provider clients."""
-        for llm_type, provider in self.providers.items():
+        """Start the debug log writer. Providers initialize lazily on first use."""
+        if _debug_enabled() and self._log_q is None:
             try:
-                if not await provider.initialize():
-                    logger.error(f"Failed to initialize {llm_type.value}")
-            except Exception as e:
-                logger.error(f"Error initializing {llm_type.value}: {e}")
+                _DEBUG_LOG_DIR.mkdir(parents=True, exist_ok=True)
+                log_file = open(_DEBUG_LOG_FILE, "a")
+            except Exception:
+                pass  # never break the CLI for debug logging
+            else:
+                self._log_q = asyncio.Queue()
+                self._log_task = asyncio.create_task(self._log_writer(self._log_q, log_file))
+
+    async def _get_provider(self, llm_type: LLMType) -> Optional[BaseProvider]:
+        """Return the provider for llm_type, creating and initializing it on first use."""
+        provider = self.providers.get(llm_type)
+        if provider is not None:
+            return provider
+
+        factory = self._factories.get(llm_type)
+        if factory is None:
+            return None
+        try:
+            provider = factory()
+            logger.debug(f"Created {llm_type.value} provider: {provider}")
+        except Exception as e:
+            logger.error(f"Failed to create {llm_type.value} provider: {e}")
+            return None
+
+        try:
+            if not await provider.initialize():
+                logger.error(f"Failed to initialize {llm_type.value}")
+        except Exception as e:
+            logger.error(f"Error initializing {llm_type.value}: {e}")
+
+        self.providers[llm_type] = provider
+        return provider
 
     async def generate(
         self,
@@ -108,23 +143,28 @@ class LLMManager:
         Returns:
             Final text response after all tool rounds complete.
         """
-        if llm_type not in self.providers:
+        provider = await self._get_provider(llm_type)
+        if provider is None:
             return f"# Error: {llm_type.value} provider not available"
 
-        provider = self.providers[llm_type]
+        # One shallow copy per call so the caller's list is never mutated.
+        # Keep it a list: appends are amortized O(1), and the provider's
+        # incremental formatter relies on slicing this same list each round.
         conversation = list(messages)
 
-        _debug_log("CONVERSATION START", {
+        self._debug_log("CONVERSATION START", lambda: {
             "system_prompt": system_prompt,
-            "messages": conversation,
+            "messages": list(conversation),
             "tools": [t.get("name") for t in tools] if tools else None,
             "max_iterations": max_iterations,
         })
 
+        tools_enabled = bool(tools and tool_handler)
+
         for iteration in range(max_iterations):
-            _debug_log(f"REQUEST iteration={iteration+1}/{max_iterations}", {
-                "messages": conversation,
-                "tools_enabled": bool(tools and tool_handler),
+            self._debug_log(f"REQUEST iteration={iteration+1}/{max_iterations}", lambda: {
+                "messages": list(conversation),
+                "tools_enabled": tools_enabled,
             })
 
             try:
@@ -134,15 +174,15 @@ class LLMManager:
                     model_id=model_id,
                     max_tokens=max_tokens,
                     temperature=temperature,
-                    tools=tools if tool_handler else None,
+                    tools=tools if tools_enabled else None,
                     **kwargs,
                 )
             except Exception as e:
-                _debug_log(f"ERROR iteration={iteration+1}", str(e))
+                self._debug_log(f"ERROR iteration={iteration+1}", lambda: str(e))
                 logger.error(f"LLM generate error (iteration {iteration}): {e}")
                 return f"# Error: {e}"
 
-            _debug_log(f"RESPONSE iteration={iteration+1}", response)
+            self._debug_log(f"RESPONSE iteration={iteration+1}", lambda: response)
 
             # If response is a string, no tool calls — we're done
             if isinstance(response, str):
@@ -165,22 +205,9 @@ class LLMManager:
                 }
                 conversation.append(assistant_msg)
 
-                # Execute each tool and add results
-                for tc in tool_calls:
-                    try:
-                        result = await tool_handler(tc["name"], tc["input"])
-                        conversation.append({
-                            "role": "tool",
-                            "tool_call_id": tc["id"],
-                            "content": str(result),
-                        })
-                    except Exception as e:
-                        logger.error(f"Tool {tc['name']} error: {e}")
-                        conversation.append({
-                            "role": "tool",
-                            "tool_call_id": tc["id"],
-                            "content": f"Error: {e}",
-                        })
+                # Execute tools concurrently; results keep tool_call order
+                results = await self._run_tools(tool_calls, tool_handler, tools)
+                conversation.extend(results)
 
                 # Continue loop — LLM will see tool results and may call more tools
                 continue
@@ -196,15 +223,10 @@ class LLMManager:
         # the model (primed by many tool-call messages) keeps generating tool
         # calls even when tool_choice is none, which the API rejects.
         logger.warning(f"Max tool iterations ({max_iterations}) reached, forcing final answer")
-        conversation.append({
-            "role": "user",
-            "content": (
-                "You have used all available tool calls. "
-                "Based on the information gathered, provide your final answer now. "
-                "Do NOT call any tools. Return ONLY the shell command."
-            ),
-        })
-        _debug_log("FINAL REQUEST (tools disabled)", {"messages": conversation})
+        conversation.append({"role": "user", "content": FINAL_ANSWER_NUDGE})
+
+        self._debug_log("FINAL REQUEST (tools disabled)", lambda: {"messages": list(conversation)})
+
         try:
             final = await provider.generate(
                 messages=conversation,
@@ -215,16 +237,134 @@ class LLMManager:
                 tools=None,
                 **kwargs,
             )
-            _debug_log("FINAL RESPONSE", final)
+            self._debug_log("FINAL RESPONSE", lambda: final)
+            if isinstance(final, dict):
+                return final.get("text_content", str(final))
             return final if isinstance(final, str) else str(final)
         except Exception as e:
-            _debug_log("FINAL ERROR", str(e))
+            self._debug_log("FINAL ERROR", lambda: str(e))
             return f"# Error after max iterations: {e}"
 
-    async def cleanup(self):
-        """Clean up all providers."""
-        for provider in self.providers.values():
+    def _debug_log(self, label: str, data_fn: Callable[[], Any]) -> None:
+        """
+        Queue a timestamped entry for the debug log writer.
+
+        data_fn is only called when debug logging is active, so call sites
+        pay nothing for building log payloads otherwise. It is called
+        immediately, but the entry is rendered later: data_fn must return a
+        snapshot of anything the caller keeps mutating (e.g. list(conversation)).
+        """
+        if self._log_q is not None:
+            self._log_q.put_nowait((time.time(), label, data_fn()))
+
+    @staticmethod
+    async def _log_writer(log_q: asyncio.Queue, log_file) -> None:
+        """Drain the debug queue into the open log file until a None sentinel."""
+        try:
+            while True:
+                entry = await log_q.get()
+                if entry is None:
+                    break
+                try:
+                    log_file.write(_format_log_entry(*entry))
+                    log_file.flush()
+                except Exception:
+                    pass  # never break the CLI for debug logging
+        finally:
+            log_file.close()
+
+    async def _run_tools(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        tool_handler: Callable,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute tool calls and return tool messages in tool_call order.
+
+        Independent tools run concurrently via asyncio.gather. Tools whose
+        schema sets "serialize": True run one at a time after the parallel
+        batch, for handlers that must not overlap.
+
+        Identical (name, input) calls in the same round run once and share
+        the result, except for side-effect tools and serialized tools.
+        """
+        serial_names = {
+            t.get("name") for t in (tools or []) if t.get("serialize")
+        }
+
+        async def _run(tc: Dict[str, Any]) -> str:
             try:
-                await provider.cleanup()
+                result = await tool_handler(tc["name"], tc["input"])
+                return str(result)
             except Exception as e:
-                logger.error(f"Cleanup error: {e}")
+                logger.error(f"Tool {tc['name']} error: {e}")
+                return f"Error: {e}"
+
+        # Unique parallel calls -> indices of every tool_call that shares them
+        groups: Dict[Any, List[int]] = {}
+        serial: List[int] = []
+        for i, tc in enumerate(tool_calls):
+            name = tc["name"]
+            if name in serial_names:
+                serial.append(i)
+            elif name in SIDE_EFFECT_TOOLS:
+                groups[i] = [i]
+            else:
+                key = (name, json_dumps(tc["input"], sort_keys=True))
+                groups.setdefault(key, []).append(i)
+
+        contents: List[Optional[str]] = [None] * len(tool_calls)
+        gathered = await asyncio.gather(
+            *(_run(tool_calls[indices[0]]) for indices in groups.values())
+        )
+        for indices, content in zip(groups.values(), gathered):
+            for i in indices:
+                contents[i] = content
+        for i in serial:
+            contents[i] = await _run(tool_calls[i])
+
+        return [
+            {"role": "tool", "tool_call_id": tc["id"], "content": content}
+            for tc, content in zip(tool_calls, contents)
+        ]
+
+    async def cleanup(self):
+        """Flush the debug log and clean up all providers."""
+        log_q, log_task = self._log_q, self._log_task
+        self._log_q = None
+        self._log_task = None
+        try:
+            if log_task is not None and not log_task.done():
+                log_q.put_nowait(None)
+                # wait() doesn't raise if the writer fails or is cancelled
+                await asyncio.wait({log_task})
+        finally:
+            for provider in self.providers.values():
+                try:
+                    await provider.cleanup()
+                except Exception as e:
+                    logger.error(f"Cleanup error: {e}")
+
+
+# Process-wide manager, so the HTTP client and its connection pool are
+# reused across queries instead of rebuilt per call.
+_manager: Optional[LLMManager] = None
+
+
+async def get_manager() -> LLMManager:
+    """Return the shared LLMManager, creating and initializing it on first use."""
+    global _manager
+    if _manager is None:
+        manager = LLMManager()
+        await manager.initialize()
+        _manager = manager
+    return _manager
+
+
+async def shutdown_manager() -> None:
+    """Clean up the shared LLMManager. Must run on the loop that used it."""
+    global _manager
+    if _manager is not None:
+        manager, _manager = _manager, None
+        await manager.cleanup()
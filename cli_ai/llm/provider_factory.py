@@ -9,7 +9,7 @@ from enum import Enum
 from typing import Optional, Dict, Any
 
 from .providers.base_provider import BaseProvider
-from .providers.groq_provider import GroqProvider
+from .cache import LLMCache
 from . import config
 
 logger = logging.getLogger(__name__)
@@ -43,9 +43,14 @@ class ProviderFactory:
         Returns:
             Configured provider instance
         """
-        provider_config = provider_config or {}
+        defaults: Dict[str, Any] = {"use_sdk": config.USE_SDK}
+        if config.CACHE_ENABLED:
+            defaults["cache"] = LLMCache()
+        provider_config = {**defaults, **(provider_config or {})}
 
         if llm_type == LLMType.GROQ:
+            from .providers.groq_provider import GroqProvider
+
             return GroqProvider(
                 api_key=api_key,
                 model=model,
@@ -10,7 +10,6 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-
 class BaseProvider(ABC):
     """
     Abstract base class for all LLM providers.
@@ -3,24 +3,81 @@ Groq Provider Implementation.
 
 OpenAI-compatible provider with native tool calling support.
 Primary provider for CLI AI due to fast inference + tool support.
+
+Requests go straight to the chat completions endpoint over httpx and the
+JSON is handled as plain dicts. The OpenAI SDK client (pydantic models,
+heavier import) is kept as a fallback, enabled with CLI_AI_USE_SDK=1.
 """
 
-import json
 import logging
 import os
-from typing import Dict, List, Optional, Union, Any
-from openai import AsyncOpenAI
+import shutil
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union, Any
 
 from .base_provider import BaseProvider
 from ..utils import (
+    SIDE_EFFECT_TOOLS,
     convert_to_standard_messages,
     convert_tools_to_openai_format,
     parse_openai_tool_calls,
     extract_text_from_content,
+    json_dumps,
+    json_encode,
+    json_loads,
 )
 
 logger = logging.getLogger(__name__)
 
+# Line endings that mean a command continues on the next line
+_CONTINUATIONS = ("\\", "&&", "||", "|", "{", "(", " do", " then", " else")
+
+
+# Builtins and keywords a command line can start with (not found by which)
+_SHELL_WORDS = frozenset({
+    ".", "[", "[[", "!", "(", "{", "alias", "bg", "case", "cd", "command",
+    "echo", "eval", "exec", "exit", "export", "fg", "for", "function",
+    "history", "if", "jobs", "kill", "popd", "printf", "pushd", "pwd",
+    "read", "select", "set", "source", "time", "type", "ulimit", "umask",
+    "unalias", "unset", "until", "wait", "while",
+})
+
+
+def _starts_with_command(line: str) -> bool:
+    """
+    Whether the first word is a command: a path, variable, assignment,
+    shell builtin or an executable on PATH. Prose lead-ins are not.
+    """
+    first = line.split(None, 1)[0]
+    if first[0] in "./~$" or "=" in first:
+        return True
+    return first in _SHELL_WORDS or shutil.which(first) is not None
+
+
+def _is_complete_command(line: str) -> bool:
+    """
+    Whether a first output line can be returned as the whole answer.
+
+    Rejects markdown fences, comments, lead-ins like "Here is the command:"
+    or "List all files", and lines that continue onto the next one
+    (trailing operators, open blocks, or a heredoc).
+    """
+    if not line or line.startswith(("```", "#")):
+        return False
+    if line.endswith(":") or line.endswith(_CONTINUATIONS):
+        return False
+    return "<<" not in line and _starts_with_command(line)
+
+
+def _raise_for_status(resp: Any) -> None:
+    """Raise with the API's error message for a non-2xx httpx response."""
+    if resp.status_code < 400:
+        return
+    try:
+        detail = json_loads(resp.content).get("error", {}).get("message")
+    except Exception:
+        detail = None
+    raise RuntimeError(f"Groq API error {resp.status_code}: {detail or resp.text[:200]}")
+
 
 class GroqProvider(BaseProvider):
     """
@@ -35,10 +92,23 @@ class GroqProvider(BaseProvider):
                  timeout: float = 30.0, **kwargs):
         super().__init__(api_key, model, timeout, **kwargs)
         self.base_url = kwargs.get("base_url", "https://api.groq.com/openai/v1")
+        self.cache = kwargs.get("cache")
+        self.use_sdk = kwargs.get("use_sdk", False)
+        # (source tools list, converted form); tool lists are constant per run
+        self._tools_cache: Optional[tuple] = None
+        # Incremental format_messages state (see format_messages)
+        self._fmt_source: Optional[List[Dict[str, Any]]] = None
+        self._fmt_system: Optional[str] = None
+        self._fmt_len = 0
+        self._fmt_cache: List[Dict[str, Any]] = []
 
     async def initialize(self) -> bool:
         """Initialize the Groq client."""
         try:
+            # Imported here: httpx (and the SDK's pydantic models) are most
+            # of the CLI's startup time and unneeded on early-exit paths.
+            import httpx
+
             # Clear proxy env vars — httpx doesn't support SOCKS without
             # socksio, and local HTTP proxies may be down. This is a short-lived
             # CLI process so clearing is safe.
@@ -46,11 +116,31 @@ class GroqProvider(BaseProvider):
                        "HTTPS_PROXY", "https_proxy"]:
                 os.environ.pop(k, None)
 
-            self.client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                timeout=self.timeout,
-            )
+            # Keep sockets warm so repeated requests skip the TLS handshake
+            limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60)
+
+            if self.use_sdk:
+                from openai import AsyncOpenAI
+
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    http_client=httpx.AsyncClient(
+                        timeout=self.timeout, follow_redirects=True, limits=limits,
+                    ),
+                )
+            else:
+                self.client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    limits=limits,
+                )
             logger.debug(f"Initialized Groq client with model: {self.model}")
             return True
         except Exception as e:
@@ -71,66 +161,116 @@ class GroqProvider(BaseProvider):
         messages: List[Dict[str, Any]],
         system_prompt: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """Convert standard messages to Groq/OpenAI ChatCompletion format."""
+        """
+        Convert standard messages to Groq/OpenAI ChatCompletion format.
+
+        Formatting is incremental: LLMManager appends to one conversation
+        list across tool rounds, so when called again with the same list
+        and system prompt only the newly appended messages are formatted.
+        """
+        if (messages is self._fmt_source and system_prompt == self._fmt_system
+                and len(messages) >= self._fmt_len):
+            tail = messages[self._fmt_len:]
+            # A late system message changes whether system_prompt applies
+            if not any(isinstance(m, dict) and m.get("role") == "system" for m in tail):
+                for msg in tail:
+                    if not isinstance(msg, dict):
+                        logger.warning(f"Invalid message format: {msg}")
+                        continue
+                    formatted = self._format_message(msg)
+                    if formatted is not None:
+                        self._fmt_cache.append(formatted)
+                self._fmt_len = len(messages)
+                return list(self._fmt_cache)
+
         standard_messages = convert_to_standard_messages(messages, system_prompt)
         groq_messages = []
-
         for msg in standard_messages:
-            role = msg.get("role")
-            content = msg.get("content")
-
-            if role == "system":
-                groq_messages.append({"role": "system", "content": str(content)})
-
-            elif role == "user":
-                # Extract text if list content provided
-                if isinstance(content, list):
-                    text_content = extract_text_from_content(content)
-                    groq_messages.append({"role": "user", "content": text_content})
-                else:
-                    groq_messages.append({"role": "user", "content": str(content)})
-
-            elif role == "assistant":
-                tool_calls_meta = msg.get("tool_calls")
-                has_tool_calls = isinstance(tool_calls_meta, list) and tool_calls_meta
-
-                # Content can be None when tool_calls are present
-                if content is None or (content == "" and has_tool_calls):
-                    content_value = None
-                else:
-                    content_value = str(content)
-
-                assistant_msg = {"role": "assistant", "content": content_value}
-
-                if has_tool_calls:
-                    formatted_calls = []
-                    for tc in tool_calls_meta:
-                        try:
-                            args = tc.get("input", {})
-                            formatted_calls.append({
-                                "id": tc.get("id"),
-                                "type": "function",
-                                "function": {
-                                    "name": tc.get("name"),
-                                    "arguments": json.dumps(args) if not isinstance(args, str) else args,
-                                },
-                            })
-                        except Exception:
-                            continue
-                    if formatted_calls:
-                        assistant_msg["tool_calls"] = formatted_calls
-
-                groq_messages.append(assistant_msg)
-
-            elif role == "tool":
-                groq_messages.append({
-                    "role": "tool",
-                    "tool_call_id": msg.get("tool_call_id", "unknown"),
-                    "content": str(content),
-                })
-
+            formatted = self._format_message(msg)
+            if formatted is not None:
+                groq_messages.append(formatted)
+
+        if isinstance(messages, list):
+            self._fmt_source = messages
+            self._fmt_system = system_prompt
+            self._fmt_len = len(messages)
+            self._fmt_cache = list(groq_messages)
         return groq_messages
 
+    @staticmethod
+    def _format_system(msg: Dict[str, Any]) -> Dict[str, Any]:
+        return {"role": "system", "content": str(msg.get("content"))}
+
+    @staticmethod
+    def _format_user(msg: Dict[str, Any]) -> Dict[str, Any]:
+        content = msg.get("content")
+        # Extract text if list content provided
+        if isinstance(content, list):
+            return {"role": "user", "content": extract_text_from_content(content)}
+        return {"role": "user", "content": str(content)}
+
+    @staticmethod
+    def _format_assistant(msg: Dict[str, Any]) -> Dict[str, Any]:
+        content = msg.get("content")
+        tool_calls_meta = msg.get("tool_calls")
+        has_tool_calls = isinstance(tool_calls_meta, list) and tool_calls_meta
+
+        # Content can be None when tool_calls are present
+        if content is None or (content == "" and has_tool_calls):
+            content_value = None
+        else:
+            content_value = str(content)
+
+        assistant_msg = {"role": "assistant", "content": content_value}
+
+        if has_tool_calls:
+            formatted_calls = []
+            for tc in tool_calls_meta:
+                try:
+                    args = tc.get("input", {})
+                    formatted_calls.append({
+                        "id": tc.get("id"),
+                        "type": "function",
+                        "function": {
+                            "name": tc.get("name"),
+                            "arguments": json_dumps(args) if not isinstance(args, str) else args,
+                        },
+                    })
+                except Exception:
+                    continue
+            if formatted_calls:
+                assistant_msg["tool_calls"] = formatted_calls
+
+        return assistant_msg
+
+    @staticmethod
+    def _format_tool(msg: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "role": "tool",
+            "tool_call_id": msg.get("tool_call_id", "unknown"),
+            "content": str(msg.get("content")),
+        }
+
+    # Role -> formatter (staticmethod objects are directly callable on 3.10+)
+    _HANDLERS = {
+        "system": _format_system,
+        "user": _format_user,
+        "assistant": _format_assistant,
+        "tool": _format_tool,
+    }
+
+    @classmethod
+    def _format_message(cls, msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Format one standard message; None for unsupported roles."""
+        handler = cls._HANDLERS.get(msg.get("role"))
+        return handler(msg) if handler else None
+
+    def _openai_tools(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert tools to OpenAI format, reusing the result for the same list."""
+        if self._tools_cache is None or self._tools_cache[0] is not tools:
+            self._tools_cache = (tools, convert_tools_to_openai_format(tools))
+        return self._tools_cache[1]
+
     async def generate(
         self,
         messages: List[Dict[str, Any]],
@@ -166,27 +306,53 @@ class GroqProvider(BaseProvider):
             chat_params["response_format"] = {"type": "json_object"}
 
         if tools:
-            chat_params["tools"] = convert_tools_to_openai_format(tools)
+            chat_params["tools"] = self._openai_tools(tools)
             chat_params["tool_choice"] = "auto"
 
         logger.debug(f"Groq request: model={model_name}, tools={len(tools) if tools else 0}")
 
+        # High temperatures are sampled too freely for a replay to be valid
+        cache_key = None
+        if self.cache is not None and temperature <= 0.5:
+            cache_key = self.cache.make_key(
+                model_name, groq_messages, tools, temperature, max_tokens, json_mode
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Groq response served from cache")
+                return cached
+
         try:
-            response = await self.client.chat.completions.create(**chat_params)
+            # Tool-less text answers are streamed so a one-line command can
+            # be returned without waiting for any trailing explanation
+            if not tools and not json_mode:
+                text_content, complete = await self._stream_text(chat_params)
+                if cache_key and complete and text_content:
+                    self.cache.set(cache_key, text_content)
+                return text_content
+
+            response = await self._complete(chat_params)
+            choices = response.get("choices") or []
+            message = choices[0].get("message") if choices else None
 
             # Check for tool calls in response
-            if (tools and response.choices and response.choices[0].message
-                    and response.choices[0].message.tool_calls):
-                message = response.choices[0].message
-                return {
-                    "text_content": message.content or "",
-                    "tool_calls": parse_openai_tool_calls(message.tool_calls),
-                    "stop_reason": response.choices[0].finish_reason,
+            if tools and message and message.get("tool_calls"):
+                result = {
+                    "text_content": message.get("content") or "",
+                    "tool_calls": parse_openai_tool_calls(message["tool_calls"]),
+                    "stop_reason": choices[0].get("finish_reason"),
                 }
+                if cache_key and not any(
+                    tc["name"] in SIDE_EFFECT_TOOLS for tc in result["tool_calls"]
+                ):
+                    self.cache.set(cache_key, result)
+                return result
 
             # Regular text response
-            if response.choices and response.choices[0].message:
-                text_content = response.choices[0].message.content or ""
+            if message:
+                text_content = message.get("content") or ""
+                if cache_key and text_content:
+                    self.cache.set(cache_key, text_content)
                 return text_content
 
             raise ValueError("No content in Groq response")
@@ -195,8 +361,85 @@ class GroqProvider(BaseProvider):
             logger.error(f"Groq generate error: {e}")
             raise
 
+    async def _complete(self, chat_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a non-streaming chat completion; returns the response JSON as a dict."""
+        if self.use_sdk:
+            response = await self.client.chat.completions.create(**chat_params)
+            return response.model_dump()
+
+        resp = await self.client.post("/chat/completions", content=json_encode(chat_params))
+        _raise_for_status(resp)
+        return json_loads(resp.content)
+
+    async def _stream_deltas(self, chat_params: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding the non-empty content deltas."""
+        if self.use_sdk:
+            stream = await self.client.chat.completions.create(**chat_params, stream=True)
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+            return
+
+        payload = json_encode({**chat_params, "stream": True})
+        async with self.client.stream("POST", "/chat/completions", content=payload) as resp:
+            if resp.status_code >= 400:
+                await resp.aread()
+                _raise_for_status(resp)
+
+            # Server-sent events: "data: {json}" lines, ending with "data: [DONE]"
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json_loads(data)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Groq stream error: {chunk['error']}")
+                choices = chunk.get("choices")
+                if choices:
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+
+    async def _stream_text(self, chat_params: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Stream a text completion, stopping early once the first line is a command.
+
+        Returns:
+            (text, complete) — complete is False when the stream was cut
+            short after the first line.
+        """
+        deltas = self._stream_deltas(chat_params)
+        parts: List[str] = []
+        first_line_checked = False
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+
+                if first_line_checked or "\n" not in delta:
+                    continue
+                head = "".join(parts).lstrip()
+                newline = head.find("\n")
+                if newline == -1:
+                    continue  # only leading blank lines so far
+                first_line_checked = True
+                line = head[:newline].strip()
+                if _is_complete_command(line):
+                    return line, False
+        finally:
+            await deltas.aclose()
+
+        return "".join(parts), True
+
     async def cleanup(self):
         """Clean up Groq client resources."""
         if self.client:
-            await self.client.close()
+            if self.use_sdk:
+                await self.client.close()
+            else:
+                await self.client.aclose()
         self.client = None
@@ -10,8 +10,74 @@ import re
 import logging
 from typing import Dict, Any, Optional, Union, List
 
+try:
+    import orjson  # optional: pip install "cli-ai[fast]"
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
+# Tools whose calls change state; their results must never be reused
+SIDE_EFFECT_TOOLS = frozenset({"shell_exec", "write_file", "delete_file"})
+
+# extract_json patterns
+_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
+
+
+def json_dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Serialize obj to a JSON string, using orjson when it is installed.
+
+    Unserializable values are rendered with str(). indent=True produces
+    2-space indented output; sort_keys=True gives a canonical form suitable
+    for use as a key.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, option=option, default=str).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; stdlib json handles them
+    return json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys, default=str)
+
+
+def json_encode(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (e.g. a request body), orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False).encode()
+
+
+# orjson silently turns integers beyond 64 bits into floats; inputs with
+# digit runs this long go to stdlib json, which keeps them exact
+_LONG_DIGITS_STR = re.compile(r"\d{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or bytes, orjson when installed. Raises ValueError on bad input.
+
+    Accepts exactly what stdlib json.loads accepts: big integers, NaN and
+    out-of-range floats fall back to the stdlib parser.
+    """
+    if orjson is not None:
+        if isinstance(data, bytes):
+            long_digits = _LONG_DIGITS_BYTES.search(data) is not None
+        else:
+            long_digits = _LONG_DIGITS_STR.search(data) is not None
+        if not long_digits:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN or 1e400; stdlib json decides
+    return json.loads(data)
+
 
 def convert_to_standard_messages(
     messages: Any, system_prompt: Optional[str] = None
@@ -36,16 +102,16 @@ def convert_to_standard_messages(
 
     elif isinstance(messages, list):
         result = []
-        has_system = any(
-            msg.get("role") == "system" for msg in messages if isinstance(msg, dict)
-        )
-        if system_prompt and not has_system:
-            result.append({"role": "system", "content": system_prompt})
+        has_system = False
         for msg in messages:
             if isinstance(msg, dict):
+                if msg.get("role") == "system":
+                    has_system = True
                 result.append(msg)
             else:
                 logger.warning(f"Invalid message format: {msg}")
+        if system_prompt and not has_system:
+            result.insert(0, {"role": "system", "content": system_prompt})
         return result
 
     else:
@@ -66,7 +132,7 @@ def convert_tools_to_openai_format(
     """
     openai_tools = []
     for tool in tools:
-        openai_tool = {
+        openai_tool: Dict[str, Any] = {
             "type": "function",
             "function": {
                 "name": tool.get("name", ""),
@@ -83,25 +149,22 @@ def parse_openai_tool_calls(
     tool_calls: list,
 ) -> List[Dict[str, Any]]:
     """
-    Parse OpenAI-format tool calls into standard format.
+    Parse OpenAI-format tool calls (response JSON dicts) into standard format.
 
     Returns list of:
         {"id": "...", "name": "...", "input": {...}}
     """
-    parsed = []
+    parsed: List[Dict[str, Any]] = []
+    append = parsed.append
     for tc in tool_calls:
-        args = tc.function.arguments
-        try:
-            args = json.loads(args) if isinstance(args, str) else args
-        except (json.JSONDecodeError, AttributeError):
-            pass
-        parsed.append(
-            {
-                "id": getattr(tc, "id", None),
-                "name": getattr(tc.function, "name", None),
-                "input": args,
-            }
-        )
+        fn = tc.get("function") or {}
+        args = fn.get("arguments")
+        if isinstance(args, str):
+            try:
+                args = json_loads(args)
+            except (ValueError, TypeError):
+                pass  # keep the raw string; the tool reports the bad input
+        append({"id": tc.get("id"), "name": fn.get("name"), "input": args})
     return parsed
 
 
@@ -112,15 +175,58 @@ def extract_text_from_content(content: Any) -> str:
     if isinstance(content, str):
         return content
     elif isinstance(content, list):
-        text_parts = []
-        for item in content:
+        if len(content) == 1:
+            # Common case: a single part, no join needed
+            item = content[0]
             if isinstance(item, dict) and item.get("type") == "text":
-                text_parts.append(item.get("text", ""))
-        return " ".join(text_parts)
+                return item.get("text", "")
+            return ""
+        # A list, not a generator: str.join builds a list from a generator
+        # first anyway, so passing one directly is faster
+        return " ".join([
+            item.get("text", "")
+            for item in content
+            if isinstance(item, dict) and item.get("type") == "text"
+        ])
     else:
         return str(content)
 
 
+def _find_balanced(text: str, open_ch: str, close_ch: str) -> List[str]:
+    """
+    Return the top-level open_ch...close_ch substrings of text, in order.
+
+    Single linear pass tracking bracket depth. Brackets inside JSON string
+    literals are ignored; quotes are only tracked inside a candidate, so
+    stray quotes in surrounding prose don't matter.
+    """
+    spans = []
+    depth = 0
+    start = 0
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == open_ch:
+            if depth == 0:
+                start = i
+            depth += 1
+        elif depth:
+            if ch == '"':
+                in_string = True
+            elif ch == close_ch:
+                depth -= 1
+                if depth == 0:
+                    spans.append(text[start:i + 1])
+    return spans
+
+
 def extract_json(text: str) -> Union[Dict, List, str]:
     """
     Extract and parse JSON from a text response.
@@ -132,44 +238,51 @@ def extract_json(text: str) -> Union[Dict, List, str]:
 
     # Try direct parse
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return json_loads(text)
+    except (ValueError, TypeError):
         pass
 
     # Try code blocks
-    code_block_pattern = r"```(?:json)?\s*([\s\S]*?)\s*```"
-    for block in re.findall(code_block_pattern, text):
+    for block in _CODE_BLOCK_RE.finditer(text):
         try:
-            return json.loads(block)
-        except json.JSONDecodeError:
+            return json_loads(block.group(1))
+        except (ValueError, TypeError):
             continue
 
-    # Try outermost JSON object
-    for match in sorted(re.findall(r"\{[\s\S]*\}", text), key=len, reverse=True):
+    # Try balanced JSON objects, largest first
+    for match in sorted(_find_balanced(text, "{", "}"), key=len, reverse=True):
         try:
-            return json.loads(match)
-        except json.JSONDecodeError:
+            return json_loads(match)
+        except (ValueError, TypeError):
             continue
 
-    # Try outermost JSON array
-    for match in sorted(re.findall(r"\[[\s\S]*\]", text), key=len, reverse=True):
+    # Try balanced JSON arrays, largest first
+    for match in sorted(_find_balanced(text, "[", "]"), key=len, reverse=True):
         try:
-            return json.loads(match)
-        except json.JSONDecodeError:
+            return json_loads(match)
+        except (ValueError, TypeError):
             continue
 
     logger.warning(f"No valid JSON found in text: {text[:100]}")
     return text
 
 
-def validate_tools_format(tools: List[Dict[str, Any]]) -> bool:
-    """Validate that tools are in the expected standard format."""
+_REQUIRED_TOOL_KEYS = frozenset({"name", "description"})
+
+
+def validate_tools_format(tools: Any) -> bool:
+    """
+    Validate that tools are in the expected standard format.
+
+    tools is Any on purpose: this checks the input's type itself, and the
+    mypyc build would otherwise reject a non-list with TypeError.
+    """
     if not isinstance(tools, list):
         return False
     for tool in tools:
         if not isinstance(tool, dict):
             return False
-        if "name" not in tool or "description" not in tool:
+        if not tool.keys() >= _REQUIRED_TOOL_KEYS:
             return False
         if "input_schema" in tool and not isinstance(tool["input_schema"], dict):
             return False
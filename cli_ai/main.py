@@ -4,12 +4,37 @@ CLI AI entrypoint.
 Reads JSON from stdin, calls the agent, prints the command to stdout.
 """
 
-import asyncio
 import json
 import os
 import sys
 
 
+def _close_loop(loop) -> None:
+    """
+    Shut down the LLM manager, cancel leftover tasks and close the loop.
+
+    Runs on success, error and Ctrl-C alike, so the shared HTTP client is
+    closed and the debug log is flushed before the process exits. The
+    manager goes first: its debug-log writer is one of the loop's tasks
+    and is stopped by draining its queue, not by cancellation.
+    """
+    import asyncio
+
+    from .llm.manager import shutdown_manager
+
+    try:
+        loop.run_until_complete(shutdown_manager())
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        loop.close()
+
+
 def main():
     """Read stdin, process query, print command."""
     try:
@@ -31,18 +56,23 @@ def main():
         history = os.environ.get("CLI_AI_HISTORY", "")
 
         # Import here to keep startup fast if there's an early exit
+        import asyncio
+
         from .agent import process_query
 
-        # Run the async agent
-        result = asyncio.run(
-            process_query(
+        # Run the async agent. A bare loop skips asyncio.run()'s runner and
+        # SIGINT handler setup, which a one-shot CLI doesn't need.
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(process_query(
                 query=query,
                 cwd=cwd,
                 history=history,
                 shell=shell,
                 os_info=os_info,
-            )
-        )
+            ))
+        finally:
+            _close_loop(loop)
 
         # Print only the command
         print(result, end="")
@@ -2,6 +2,8 @@
 System prompt template for CLI AI.
 """
 
+import string
+
 SYSTEM_PROMPT = """You are a shell command translator. You convert natural language requests into shell commands for Zsh on Ubuntu Linux.
 
 Rules:
@@ -21,6 +23,14 @@ Context:
 {history}"""
 
 
+# (literal_text, field_name) pairs, parsed once; field_name is None after
+# the last field
+_PARSED = [
+    (literal, field)
+    for literal, field, _spec, _conv in string.Formatter().parse(SYSTEM_PROMPT)
+]
+
+
 def build_system_prompt(
     cwd: str,
     history: str = "",
@@ -28,9 +38,15 @@ def build_system_prompt(
     os_info: str = "linux",
 ) -> str:
     """Build the system prompt with context variables filled in."""
-    return SYSTEM_PROMPT.format(
-        cwd=cwd,
-        shell=shell,
-        os=os_info,
-        history=history.strip() if history else "(no recent history)",
-    )
+    values = {
+        "cwd": cwd,
+        "shell": shell,
+        "os": os_info,
+        "history": history.strip() if history else "(no recent history)",
+    }
+    parts = []
+    for literal, field in _PARSED:
+        parts.append(literal)
+        if field is not None:
+            parts.append(values[field])
+    return "".join(parts)
@@ -5,11 +5,14 @@ The AI can use these tools to inspect the local environment before
 suggesting a shell command. All tools are read-only and path-safe.
 """
 
-import glob
+import asyncio
+import fnmatch
+import functools
+import itertools
 import os
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, FrozenSet, Iterator, List, Optional, Tuple
 
 from . import config_file
 
@@ -20,6 +23,27 @@ MAX_FILE_LINES = config_file.get("max_file_lines")
 MAX_FILE_SIZE = 100 * 1024  # 100KB
 MAX_SEARCH_RESULTS = 50
 MAX_LIST_DEPTH = 3
+GREP_MAX_FILES = 200  # files grep_files scans per call, to keep it fast
+GREP_BATCH_SIZE = 32  # files read concurrently by grep_files
+
+# Names each tool skips (hidden names are skipped too); excluded
+# directories are never descended into
+_LIST_EXCLUDE = frozenset({"node_modules", "__pycache__", ".git"})
+_SEARCH_EXCLUDE = frozenset({"node_modules", "__pycache__"})
+_GREP_EXCLUDE = frozenset({"node_modules", "__pycache__", "build", "dist", ".git"})
+
+# Extensions assumed to be text; _is_binary skips the sniff for these
+_TEXT_EXTS = frozenset({
+    ".py", ".md", ".json", ".txt", ".js", ".ts", ".toml", ".yaml", ".yml",
+    ".html", ".css", ".c", ".h", ".cpp", ".hpp", ".rs", ".go", ".sh", ".zsh",
+    ".bash", ".cfg", ".ini", ".rst", ".sql", ".xml",
+})
+
+
+@functools.lru_cache(maxsize=4)
+def _resolved_cwd(cwd: str) -> str:
+    """Real path of the working directory; constant for an agent run."""
+    return os.path.realpath(cwd)
 
 
 def _resolve_safe_path(path_str: str, cwd: str) -> Path:
@@ -29,17 +53,29 @@ def _resolve_safe_path(path_str: str, cwd: str) -> Path:
     Raises:
         ValueError: If path escapes CWD
     """
-    cwd_path = Path(cwd).resolve()
-    target = (cwd_path / path_str).resolve()
+    cwd_real = _resolved_cwd(cwd)
+    target = os.path.realpath(os.path.join(cwd_real, path_str))
 
-    if not str(target).startswith(str(cwd_path)):
+    if os.path.commonpath([target, cwd_real]) != cwd_real:
         raise ValueError(f"Path traversal blocked: {path_str}")
 
-    return target
+    return Path(target)
 
 
 def _is_binary(path: Path) -> bool:
-    """Check if a file appears to be binary."""
+    """Check if a file appears to be binary (memoized until the file changes)."""
+    if path.suffix.lower() in _TEXT_EXTS:
+        return False
+    try:
+        st = os.stat(path)
+    except OSError:
+        return True
+    return _sniff_binary(str(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sniff_binary(path: str, mtime_ns: int, size: int) -> bool:
+    """Look for a NUL byte in the first 8KB. mtime_ns and size key the cache."""
     try:
         with open(path, "rb") as f:
             chunk = f.read(8192)
@@ -48,6 +84,45 @@ def _is_binary(path: Path) -> bool:
         return True
 
 
+def _sorted_entries(path: str) -> Iterator[os.DirEntry]:
+    """Directory entries sorted by name; unreadable directories yield nothing."""
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return iter(())
+    return iter(entries)
+
+
+def _iter_entries(root: Path, exclude: FrozenSet[str]) -> Iterator[os.DirEntry]:
+    """
+    Yield entries under root, lazily, in sorted pre-order.
+
+    This is the order sorted(root.rglob("*")) produced. Hidden and excluded
+    names are pruned before descending, and symlinked directories are not
+    followed.
+    """
+    stack = [_sorted_entries(str(root))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        name = entry.name
+        if name[0] == "." or name in exclude:
+            continue
+        yield entry
+        if entry.is_dir(follow_symlinks=False):
+            stack.append(_sorted_entries(entry.path))
+
+
+def _iter_files(root: Path) -> Iterator[os.DirEntry]:
+    """Yield the regular files grep_files should scan, in walk order."""
+    for entry in _iter_entries(root, _GREP_EXCLUDE):
+        if not entry.is_dir(follow_symlinks=False) and entry.is_file():
+            yield entry
+
+
 def read_file(path: str, cwd: str) -> str:
     """Read contents of a text file (max 500 lines, 100KB)."""
     target = _resolve_safe_path(path, cwd)
@@ -62,10 +137,15 @@ def read_file(path: str, cwd: str) -> str:
         return f"Error: Binary file, cannot read: {path}"
 
     try:
-        lines = target.read_text(errors="replace").splitlines()
-        if len(lines) > MAX_FILE_LINES:
-            content = "\n".join(lines[:MAX_FILE_LINES])
-            return f"{content}\n\n[Truncated: showing {MAX_FILE_LINES}/{len(lines)} lines]"
+        with target.open("r", errors="replace") as f:
+            # Read one line past the cap to learn whether the file is longer
+            lines = [line.rstrip("\n") for line in itertools.islice(f, MAX_FILE_LINES + 1)]
+            if len(lines) > MAX_FILE_LINES:
+                lines.pop()
+                # Count the rest without keeping it, only for the banner
+                total = MAX_FILE_LINES + 1 + sum(1 for _ in f)
+                content = "\n".join(lines)
+                return f"{content}\n\n[Truncated: showing {MAX_FILE_LINES}/{total} lines]"
         return "\n".join(lines)
     except Exception as e:
         return f"Error reading file: {e}"
@@ -83,24 +163,27 @@ def list_directory(path: str, cwd: str, depth: int = 1) -> str:
     depth = min(depth, MAX_LIST_DEPTH)
     lines = []
 
-    def _walk(dir_path: Path, current_depth: int, prefix: str = ""):
+    def _walk(dir_path: str, current_depth: int, prefix: str = ""):
         if current_depth > depth:
             return
         try:
-            entries = sorted(dir_path.iterdir(), key=lambda e: (not e.is_dir(), e.name))
+            # DirEntry caches its type, so sorting dirs first costs no stat()
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: (not e.is_dir(), e.name))
         except PermissionError:
             lines.append(f"{prefix}[permission denied]")
             return
 
         for entry in entries:
             # Skip hidden files and common noise
-            if entry.name.startswith(".") or entry.name in ("node_modules", "__pycache__", ".git"):
+            name = entry.name
+            if name[0] == "." or name in _LIST_EXCLUDE:
                 continue
 
             if entry.is_dir():
-                lines.append(f"{prefix}{entry.name}/")
+                lines.append(f"{prefix}{name}/")
                 if current_depth < depth:
-                    _walk(entry, current_depth + 1, prefix + "  ")
+                    _walk(entry.path, current_depth + 1, prefix + "  ")
             else:
                 size = entry.stat().st_size
                 if size < 1024:
@@ -109,12 +192,25 @@ def list_directory(path: str, cwd: str, depth: int = 1) -> str:
                     size_str = f"{size // 1024}KB"
                 else:
                     size_str = f"{size // (1024 * 1024)}MB"
-                lines.append(f"{prefix}{entry.name}  ({size_str})")
+                lines.append(f"{prefix}{name}  ({size_str})")
 
-    _walk(target, 1)
+    _walk(str(target), 1)
     return "\n".join(lines) if lines else "(empty directory)"
 
 
+def _glob_match(parts: Tuple[str, ...], segments: Tuple[str, ...]) -> bool:
+    """
+    Match path components against glob segments, one component per
+    segment. A "**" segment spans zero or more components, as in glob.
+    """
+    if not segments:
+        return not parts
+    head, rest = segments[0], segments[1:]
+    if head == "**":
+        return any(_glob_match(parts[i:], rest) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatchcase(parts[0], head) and _glob_match(parts[1:], rest)
+
+
 def search_files(pattern: str, path: str, cwd: str) -> str:
     """Search for files matching a glob pattern. Returns paths only."""
     target = _resolve_safe_path(path, cwd)
@@ -122,22 +218,22 @@ def search_files(pattern: str, path: str, cwd: str) -> str:
     if not target.exists() or not target.is_dir():
         return f"Error: Directory not found: {path}"
 
-    search_pattern = str(target / "**" / pattern)
+    # Same reach as globbing "<path>/**/<pattern>": segments are matched
+    # one path component at a time, so "*" never crosses a "/"
+    segments = tuple(seg for seg in pattern.split("/") if seg)
+    glob_segments = ("**",) + segments
+    last = segments[-1] if segments else "**"
     matches = []
 
-    for match in glob.iglob(search_pattern, recursive=True):
-        match_path = Path(match)
-        # Skip hidden, node_modules, __pycache__
-        parts = match_path.parts
-        if any(p.startswith(".") or p in ("node_modules", "__pycache__") for p in parts):
+    for entry in _iter_entries(target, _SEARCH_EXCLUDE):
+        # The last segment always matches the entry's own name
+        if last != "**" and not fnmatch.fnmatchcase(entry.name, last):
             continue
-
-        try:
-            rel = match_path.relative_to(target)
-            matches.append(str(rel))
-        except ValueError:
+        rel = os.path.relpath(entry.path, target)
+        if len(segments) > 1 and not _glob_match(tuple(rel.split(os.sep)), glob_segments):
             continue
 
+        matches.append(rel)
         if len(matches) >= MAX_SEARCH_RESULTS:
             break
 
@@ -150,50 +246,83 @@ def search_files(pattern: str, path: str, cwd: str) -> str:
     return result
 
 
-def grep_files(pattern: str, path: str, cwd: str, ignore_case: bool = True) -> str:
-    """Search file contents for a string pattern. Returns matching lines."""
+def _grep_file(file_path: str, compare_pattern: str, ignore_case: bool) -> Optional[List[Tuple[int, str]]]:
+    """
+    Scan one file for compare_pattern. Runs in a worker thread.
+
+    Returns (line_num, stripped_line) matches, at most MAX_SEARCH_RESULTS,
+    or None if the file was skipped (unreadable, too large or binary).
+    """
+    # One read covers the size cap, the binary sniff and the content
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read(MAX_FILE_SIZE + 1)
+    except Exception:
+        return None
+    if len(data) > MAX_FILE_SIZE or b"\x00" in data[:8192]:
+        return None
+
+    text = data.decode("utf-8", errors="replace")
+
+    # Lowercase once per file and skip files without a match outright;
+    # lower() never adds or removes line breaks, so lines stay paired
+    haystack = text.lower() if ignore_case else text
+    if compare_pattern not in haystack:
+        return []
+    found = []
+    for line_num, (line, compare_line) in enumerate(
+        zip(text.splitlines(), haystack.splitlines()), 1
+    ):
+        if compare_pattern in compare_line:
+            found.append((line_num, line.strip()))
+            if len(found) >= MAX_SEARCH_RESULTS:
+                break
+    return found
+
+
+async def grep_files(pattern: str, path: str, cwd: str, ignore_case: bool = True) -> str:
+    """
+    Search file contents for a string pattern. Returns matching lines.
+
+    Files are read in worker threads, GREP_BATCH_SIZE at a time; results
+    are collected in walk order, so output matches a serial scan.
+    """
     target = _resolve_safe_path(path, cwd)
 
     if not target.exists() or not target.is_dir():
         return f"Error: Directory not found: {path}"
 
-    matches = []
+    matches: List[str] = []
     files_scanned = 0
-    max_files = 200  # cap to keep it fast
-
-    for file_path in sorted(target.rglob("*")):
-        if files_scanned >= max_files:
+    max_files = GREP_MAX_FILES
+    compare_pattern = pattern.lower() if ignore_case else pattern
+    files = _iter_files(target)
+
+    while files_scanned < max_files and len(matches) < MAX_SEARCH_RESULTS:
+        # Never read more candidates than the file cap could still count
+        batch_size = min(GREP_BATCH_SIZE, max_files - files_scanned)
+        batch = list(itertools.islice(files, batch_size))
+        if not batch:
             break
+        results = await asyncio.gather(*(
+            asyncio.to_thread(_grep_file, entry.path, compare_pattern, ignore_case)
+            for entry in batch
+        ))
 
-        # Skip dirs, hidden, noise
-        parts = file_path.relative_to(target).parts
-        if any(p.startswith(".") or p in ("node_modules", "__pycache__", "build",
-               "dist", ".git") for p in parts):
-            continue
-
-        if not file_path.is_file():
-            continue
-        if file_path.stat().st_size > MAX_FILE_SIZE:
-            continue
-        if _is_binary(file_path):
-            continue
-
-        files_scanned += 1
-        try:
-            text = file_path.read_text(errors="replace")
-        except Exception:
-            continue
-
-        compare_pattern = pattern.lower() if ignore_case else pattern
-        for line_num, line in enumerate(text.splitlines(), 1):
-            compare_line = line.lower() if ignore_case else line
-            if compare_pattern in compare_line:
-                rel = file_path.relative_to(target)
-                matches.append(f"{rel}:{line_num}: {line.strip()}")
-                if len(matches) >= MAX_SEARCH_RESULTS:
-                    break
-        if len(matches) >= MAX_SEARCH_RESULTS:
-            break
+        for entry, found in zip(batch, results):
+            if found is None:
+                continue
+            if files_scanned >= max_files:
+                break
+            files_scanned += 1
+            if found:
+                rel = os.path.relpath(entry.path, target)
+                for line_num, line in found:
+                    matches.append(f"{rel}:{line_num}: {line}")
+                    if len(matches) >= MAX_SEARCH_RESULTS:
+                        break
+            if len(matches) >= MAX_SEARCH_RESULTS:
+                break
 
     if not matches:
         return f"No matches for '{pattern}' in {path} ({files_scanned} files searched)"
@@ -216,17 +345,19 @@ def read_lines(path: str, start: int, end: int, cwd: str) -> str:
         return f"Error: Binary file: {path}"
 
     try:
-        lines = target.read_text(errors="replace").splitlines()
-        total = len(lines)
+        start = max(1, start)
+        with target.open("r", errors="replace") as f:
+            # Keep only the requested window; lines around it are just counted
+            skipped = sum(1 for _ in itertools.islice(f, start - 1))
+            selected = [line.rstrip("\n") for line in itertools.islice(f, max(0, end - start + 1))]
+            total = skipped + len(selected) + sum(1 for _ in f)
 
         # Clamp range
-        start = max(1, start)
         end = min(end, total)
 
         if start > total:
             return f"Error: Start line {start} exceeds file length ({total} lines)"
 
-        selected = lines[start - 1 : end]
         numbered = [f"{i}: {line}" for i, line in enumerate(selected, start=start)]
         header = f"Lines {start}-{end} of {total}:"
         return f"{header}\n" + "\n".join(numbered)
@@ -349,7 +480,7 @@ async def execute_tool(name: str, args: Dict[str, Any], cwd: str) -> str:
     elif name == "search_files":
         return search_files(args["pattern"], args.get("path", "."), cwd)
     elif name == "grep_files":
-        return grep_files(args["pattern"], args.get("path", "."), cwd)
+        return await grep_files(args["pattern"], args.get("path", "."), cwd)
     elif name == "read_lines":
         return read_lines(args["path"], args["start"], args["end"], cwd)
     else:
@@ -0,0 +1,43 @@
+"""
+Optional compiled build for CLI AI.
+
+By default this is a plain pure-Python package. With CLI_AI_MYPYC=1 and
+mypy installed in the build environment, the string-processing modules
+are compiled to C extensions with mypyc:
+
+    pip install mypy setuptools wheel
+    CLI_AI_MYPYC=1 pip install --no-build-isolation .
+
+An install built without CLI_AI_MYPYC is the plain pure-Python package.
+Once the extensions are installed they always take precedence over the
+.py sources: a broken or ABI-mismatched extension raises ImportError, it
+does not fall back to Python. Rebuild, or reinstall without CLI_AI_MYPYC,
+to recover.
+
+Compiled functions check their argument annotations at runtime, so a
+function that validates its input's type must annotate it as Any.
+
+tests/test_build.py type-checks MYPYC_MODULES with the same flags, so a
+change that would break the compiled build fails the test suite. Run it
+with CLI_AI_MYPYC=1 to also build the extensions in a scratch copy and
+run the suite against them.
+"""
+
+import os
+
+from setuptools import setup
+
+# Pure string/dict processing: output cleanup, message and tool-call parsing
+MYPYC_MODULES = [
+    "cli_ai/agent.py",
+    "cli_ai/llm/utils.py",
+]
+
+ext_modules = []
+if os.environ.get("CLI_AI_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    # Only the compiled modules need to type-check cleanly
+    ext_modules = mypycify(["--follow-imports=silent", *MYPYC_MODULES], opt_level="3")
+
+setup(ext_modules=ext_modules)
@@ -0,0 +1,30 @@
+"""Tests for agent output cleanup."""
+
+import pytest
+
+from cli_ai.agent import _clean_command
+
+
+class TestCleanCommand:
+    """LLM output is reduced to a bare command."""
+
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [
+            ("ls -la", "ls -la"),
+            ("  ls -la \n", "ls -la"),
+            ("`ls -la`", "ls -la"),
+            ("```bash\nls -la\n```", "ls -la"),
+            ("```\ncd src && make\n```", "cd src && make"),
+            ("$ ls -la", "ls -la"),
+            ('<function=read_file>{"path": "a"}</function>ls', "ls"),
+            ('ls <function=read_file>{"path": "a"}</function>', "ls"),
+            ("# cannot do that", "# cannot do that"),
+            ("Here is the command:\nls -la", "ls -la"),
+            ("# note\nls -la", "ls -la"),
+            ("ls -la\n# trailing comment", "# trailing comment"),
+            ("", ""),
+        ],
+    )
+    def test_cleans(self, raw, expected):
+        assert _clean_command(raw) == expected
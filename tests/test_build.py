@@ -0,0 +1,80 @@
+"""Tests for the optional mypyc build (setup.py)."""
+
+import ast
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _mypyc_modules() -> list:
+    """Read MYPYC_MODULES from setup.py without running setup()."""
+    tree = ast.parse((ROOT / "setup.py").read_text())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "MYPYC_MODULES" for t in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise AssertionError("MYPYC_MODULES not found in setup.py")
+
+
+class TestMypycModules:
+    """The compiled modules must type-check, or the mypyc build fails."""
+
+    def test_modules_exist(self):
+        for module in _mypyc_modules():
+            assert (ROOT / module).is_file(), module
+
+    def test_modules_type_check(self, monkeypatch):
+        api = pytest.importorskip("mypy.api")
+        monkeypatch.chdir(ROOT)
+
+        stdout, stderr, status = api.run(
+            ["--follow-imports=silent", *_mypyc_modules()]
+        )
+
+        assert status == 0, stdout + stderr
+
+
+@pytest.mark.skipif(
+    os.environ.get("CLI_AI_MYPYC") != "1",
+    reason="builds C extensions; set CLI_AI_MYPYC=1 to run",
+)
+class TestCompiledBuild:
+    """The suite passes against the mypyc-compiled modules, not just mypy."""
+
+    def test_suite_passes_compiled(self, tmp_path):
+        pytest.importorskip("mypyc")
+        ignore = shutil.ignore_patterns("__pycache__", "*.so", "build")
+        for name in ("cli_ai", "tests"):
+            shutil.copytree(ROOT / name, tmp_path / name, ignore=ignore)
+        for name in ("setup.py", "pyproject.toml"):
+            shutil.copy(ROOT / name, tmp_path / name)
+
+        build = subprocess.run(
+            [sys.executable, "setup.py", "build_ext", "--inplace"],
+            cwd=tmp_path, capture_output=True, text=True,
+        )
+        assert build.returncode == 0, build.stdout[-2000:] + build.stderr[-2000:]
+
+        # Run without CLI_AI_MYPYC so this test doesn't recurse
+        env = {k: v for k, v in os.environ.items() if k != "CLI_AI_MYPYC"}
+        check = "; ".join(
+            f"import {m[:-3].replace('/', '.')} as m; assert m.__file__.endswith('.so'), m.__file__"
+            for m in _mypyc_modules()
+        )
+        loaded = subprocess.run(
+            [sys.executable, "-c", check], cwd=tmp_path, env=env, capture_output=True, text=True,
+        )
+        assert loaded.returncode == 0, loaded.stderr
+
+        suite = subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests"],
+            cwd=tmp_path, env=env, capture_output=True, text=True,
+        )
+        assert suite.returncode == 0, suite.stdout[-4000:]
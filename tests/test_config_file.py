@@ -28,6 +28,7 @@ class TestDefaults:
         assert cfg["history_lines"] == 20
         assert cfg["max_iterations"] == 5
         assert cfg["max_file_lines"] == 500
+        assert cfg["cache"] is True
 
     def test_get_returns_defaults(self):
         with patch.object(config_file, "CONFIG_PATH", Path("/nonexistent/config.toml")):
@@ -44,7 +45,8 @@ class TestLoadsToml:
         config.write_text(
             '[provider]\nprimary = "cerebras"\nmodel = "my-model"\n\n'
             "[context]\nhistory_lines = 30\n\n"
-            "[tools]\nmax_iterations = 3\nmax_file_lines = 200\n"
+            "[tools]\nmax_iterations = 3\nmax_file_lines = 200\n\n"
+            "[cache]\nenabled = false\n"
         )
         with patch.object(config_file, "CONFIG_PATH", config):
             cfg = config_file.load_config()
@@ -54,6 +56,7 @@ class TestLoadsToml:
         assert cfg["history_lines"] == 30
         assert cfg["max_iterations"] == 3
         assert cfg["max_file_lines"] == 200
+        assert cfg["cache"] is False
 
     def test_partial_config_merges_with_defaults(self, tmp_path):
         config = tmp_path / "config.toml"
@@ -159,3 +162,89 @@ class TestCaching:
 
         assert cfg1["history_lines"] == 99
         assert cfg2["history_lines"] == 1
+
+    def test_loaded_config_is_read_only(self):
+        with patch.object(config_file, "CONFIG_PATH", Path("/nonexistent/config.toml")):
+            cfg = config_file.load_config()
+
+        with pytest.raises(TypeError):
+            cfg["provider"] = "cerebras"
+        with pytest.raises(TypeError):
+            config_file.DEFAULTS["provider"] = "cerebras"
+        assert config_file.get("provider") == "groq"
+        assert config_file.get("no_such_key") is None
+
+
+class TestParseCache:
+    """Parsed TOML is pickled and reused while the file is unchanged."""
+
+    def test_writes_parse_cache(self, tmp_path):
+        config = tmp_path / "config.toml"
+        config.write_text("[context]\nhistory_lines = 30\n")
+        with patch.object(config_file, "CONFIG_PATH", config):
+            config_file.load_config()
+
+        assert (tmp_path / config_file.PARSE_CACHE_NAME).exists()
+
+    def test_unchanged_file_skips_parse(self, tmp_path):
+        config = tmp_path / "config.toml"
+        config.write_text("[context]\nhistory_lines = 30\n")
+        with patch.object(config_file, "CONFIG_PATH", config):
+            config_file.load_config()
+            config_file.reset()
+            with patch.object(config_file, "_parse_toml", side_effect=AssertionError("reparsed")):
+                cfg = config_file.load_config()
+
+        assert cfg["history_lines"] == 30
+
+    def test_changed_file_is_reparsed(self, tmp_path):
+        config = tmp_path / "config.toml"
+        config.write_text("[context]\nhistory_lines = 30\n")
+        with patch.object(config_file, "CONFIG_PATH", config):
+            config_file.load_config()
+            config_file.reset()
+            config.write_text("[context]\nhistory_lines = 450\n")
+            cfg = config_file.load_config()
+
+        assert cfg["history_lines"] == 450
+
+    def test_corrupt_parse_cache_ignored(self, tmp_path):
+        config = tmp_path / "config.toml"
+        config.write_text("[context]\nhistory_lines = 30\n")
+        (tmp_path / config_file.PARSE_CACHE_NAME).write_bytes(b"garbage")
+        with patch.object(config_file, "CONFIG_PATH", config):
+            cfg = config_file.load_config()
+
+        assert cfg["history_lines"] == 30
+
+
+class TestParsers:
+    """rtoml and tomllib produce the same config."""
+
+    @pytest.mark.parametrize("rtoml_available", [True, False])
+    def test_same_result(self, tmp_path, rtoml_available):
+        if rtoml_available:
+            pytest.importorskip("rtoml")
+        config = tmp_path / "config.toml"
+        config.write_text(
+            '[provider]\nprimary = "cerebras"\n\n[tools]\nmax_iterations = 3\n'
+        )
+        modules = {} if rtoml_available else {"rtoml": None}
+        with patch.dict(sys.modules, modules), patch.object(config_file, "CONFIG_PATH", config):
+            cfg = config_file.load_config()
+
+        assert cfg["provider"] == "cerebras"
+        assert cfg["max_iterations"] == 3
+
+    @pytest.mark.parametrize("rtoml_available", [True, False])
+    def test_corrupt_toml_reported(self, tmp_path, capsys, rtoml_available):
+        if rtoml_available:
+            pytest.importorskip("rtoml")
+        config = tmp_path / "config.toml"
+        config.write_text("this is not valid toml {{{}}")
+        modules = {} if rtoml_available else {"rtoml": None}
+        with patch.dict(sys.modules, modules), patch.object(config_file, "CONFIG_PATH", config):
+            cfg = config_file.load_config()
+
+        assert cfg == config_file.DEFAULTS
+        assert "error reading config" in capsys.readouterr().err
@@ -0,0 +1,290 @@
+"""Tests for GroqProvider message formatting and streaming."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import httpx
+
+from cli_ai.llm.cache import LLMCache
+from cli_ai.llm.providers import groq_provider
+from cli_ai.llm.providers.groq_provider import GroqProvider
+
+
+def _conversation():
+    return [
+        {"role": "user", "content": "launch the backend"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": "c1", "name": "read_file", "input": {"path": "package.json"}}],
+        },
+        {"role": "tool", "tool_call_id": "c1", "content": '{"scripts": {}}'},
+    ]
+
+
+class TestFormatMessages:
+    """Messages convert to OpenAI chat format."""
+
+    def test_formats_all_roles(self):
+        out = GroqProvider("key").format_messages(_conversation(), system_prompt="sys")
+
+        assert out[0] == {"role": "system", "content": "sys"}
+        assert out[1] == {"role": "user", "content": "launch the backend"}
+        function = out[2]["tool_calls"][0]["function"]
+        assert function["name"] == "read_file"
+        assert json.loads(function["arguments"]) == {"path": "package.json"}
+        assert out[3] == {"role": "tool", "tool_call_id": "c1", "content": '{"scripts": {}}'}
+
+    def test_existing_system_message_kept(self):
+        messages = [{"role": "system", "content": "mine"}, {"role": "user", "content": "hi"}]
+        out = GroqProvider("key").format_messages(messages, system_prompt="sys")
+
+        assert out == [{"role": "system", "content": "mine"}, {"role": "user", "content": "hi"}]
+
+    def test_unknown_role_dropped(self):
+        messages = [{"role": "function", "content": "x"}, {"role": "user", "content": "hi"}]
+        out = GroqProvider("key").format_messages(messages)
+
+        assert out == [{"role": "user", "content": "hi"}]
+
+
+class TestIncrementalFormatting:
+    """Appending to the same list only formats the new messages."""
+
+    def test_incremental_matches_full(self):
+        provider = GroqProvider("key")
+        conversation = _conversation()[:1]
+        provider.format_messages(conversation, system_prompt="sys")
+        conversation.extend(_conversation()[1:])
+
+        incremental = provider.format_messages(conversation, system_prompt="sys")
+        full = GroqProvider("key").format_messages(conversation, system_prompt="sys")
+
+        assert incremental == full
+
+    def test_only_tail_formatted(self):
+        provider = GroqProvider("key")
+        conversation = _conversation()
+        provider.format_messages(conversation, system_prompt="sys")
+        conversation.append({"role": "user", "content": "again"})
+
+        with patch.object(GroqProvider, "_format_message", wraps=GroqProvider._format_message) as fmt:
+            out = provider.format_messages(conversation, system_prompt="sys")
+
+        assert fmt.call_count == 1
+        assert out[-1] == {"role": "user", "content": "again"}
+
+    def test_new_list_rebuilds(self):
+        provider = GroqProvider("key")
+        provider.format_messages(_conversation(), system_prompt="sys")
+        out = provider.format_messages([{"role": "user", "content": "other"}], system_prompt="sys")
+
+        assert out == [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "other"},
+        ]
+
+    def test_system_prompt_change_rebuilds(self):
+        provider = GroqProvider("key")
+        conversation = _conversation()
+        provider.format_messages(conversation, system_prompt="sys")
+        out = provider.format_messages(conversation, system_prompt="final")
+
+        assert out[0] == {"role": "system", "content": "final"}
+
+    def test_returned_list_not_shared(self):
+        provider = GroqProvider("key")
+        conversation = _conversation()
+        first = provider.format_messages(conversation, system_prompt="sys")
+        conversation.append({"role": "user", "content": "again"})
+        provider.format_messages(conversation, system_prompt="sys")
+
+        assert len(first) == 4
+
+
+class _FakeStream:
+    """Async iterator over content deltas, like openai.AsyncStream."""
+
+    def __init__(self, deltas):
+        self._deltas = list(deltas)
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self._deltas):
+            raise StopAsyncIteration
+        delta = self._deltas[self.consumed]
+        self.consumed += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def close(self):
+        self.closed = True
+
+
+def _streaming_provider(deltas, cache=None):
+    stream = _FakeStream(deltas)
+
+    async def create(**params):
+        assert params.get("stream") is True
+        return stream
+
+    provider = GroqProvider("key", cache=cache, use_sdk=True)
+    provider.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    return provider, stream
+
+
+def _generate(provider):
+    return asyncio.run(provider.generate([{"role": "user", "content": "list files"}]))
+
+
+class TestStreaming:
+    """Text answers stream and stop at the first complete command line (SDK client)."""
+
+    def test_stops_after_first_command_line(self):
+        provider, stream = _streaming_provider(["ls ", "-la\nThis lists", " all files", "."])
+
+        assert _generate(provider) == "ls -la"
+        assert stream.consumed == 2
+        assert stream.closed
+
+    def test_single_line_reads_to_end(self):
+        provider, stream = _streaming_provider(["du -sh * ", "| sort -rh"])
+
+        assert _generate(provider) == "du -sh * | sort -rh"
+        assert stream.closed
+
+    @pytest.mark.parametrize(
+        "deltas",
+        [
+            ["Here is the command:\n", "ls -la"],
+            ["```bash\n", "ls -la\n", "```"],
+            ["docker run \\\n", "  -it ubuntu"],
+            ["cd src &&\n", "make"],
+            ["List all files\n", "ls -la"],
+            ["To see hidden files, run\n", "ls -a"],
+        ],
+    )
+    def test_reads_to_end_when_first_line_incomplete(self, deltas):
+        provider, stream = _streaming_provider(deltas)
+
+        assert _generate(provider) == "".join(deltas)
+        assert stream.consumed == len(deltas)
+
+    @pytest.mark.parametrize("line", [
+        "List all files",
+        "This lists all files.",
+        "Sure, here you go",
+        "The command is ls -la",
+        "list every python file",
+    ])
+    def test_prose_first_line_is_not_a_command(self, line):
+        with patch.object(groq_provider.shutil, "which", return_value=None):
+            assert groq_provider._is_complete_command(line) is False
+
+    @pytest.mark.parametrize("line", [
+        "git status",
+        "./run.sh --fast",
+        "~/bin/deploy",
+        "FOO=1 make test",
+        "$EDITOR notes.txt",
+        "cd /tmp",
+        "for f in *.py; do wc -l $f; done",
+    ])
+    def test_command_first_line(self, line):
+        def which(word):
+            return "/usr/bin/git" if word == "git" else None
+
+        with patch.object(groq_provider.shutil, "which", side_effect=which):
+            assert groq_provider._is_complete_command(line) is True
+
+    def test_only_complete_streams_cached(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "cache.json")
+        provider, _ = _streaming_provider(["ls -la\n", "explanation"], cache=cache)
+        _generate(provider)
+        assert cache._load() == {}
+
+        provider, _ = _streaming_provider(["ls -la"], cache=cache)
+        _generate(provider)
+        assert list(v["value"] for v in cache._load().values()) == ["ls -la"]
+
+
+def _sse(*chunks: dict) -> bytes:
+    events = [f"data: {json.dumps(c)}\n\n" for c in chunks] + ["data: [DONE]\n\n"]
+    return "".join(events).encode()
+
+
+def _delta(text: str) -> dict:
+    return {"choices": [{"index": 0, "delta": {"content": text}}]}
+
+
+def _http_provider(handler) -> GroqProvider:
+    provider = GroqProvider("key")
+    provider.client = httpx.AsyncClient(
+        base_url=provider.base_url, transport=httpx.MockTransport(handler)
+    )
+    return provider
+
+
+class TestHttpClient:
+    """Default path: plain httpx requests against /chat/completions."""
+
+    def test_tool_call_response(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"choices": [{
+                "finish_reason": "tool_calls",
+                "message": {"content": None, "tool_calls": [{
+                    "id": "c1",
+                    "type": "function",
+                    "function": {"name": "read_file", "arguments": '{"path": "a.txt"}'},
+                }]},
+            }]})
+
+        provider = _http_provider(handler)
+        tools = [{"name": "read_file", "description": "", "input_schema": {}}]
+        result = asyncio.run(
+            provider.generate([{"role": "user", "content": "x"}], tools=tools)
+        )
+
+        assert result == {
+            "text_content": "",
+            "tool_calls": [{"id": "c1", "name": "read_file", "input": {"path": "a.txt"}}],
+            "stop_reason": "tool_calls",
+        }
+        assert requests[0].url.path == "/openai/v1/chat/completions"
+        body = json.loads(requests[0].content)
+        assert body["tool_choice"] == "auto"
+        assert "stream" not in body
+
+    def test_streamed_text_response(self):
+        def handler(request):
+            assert json.loads(request.content)["stream"] is True
+            return httpx.Response(
+                200, content=_sse(_delta("ls "), _delta("-la\nLists"), _delta(" files"))
+            )
+
+        assert _generate(_http_provider(handler)) == "ls -la"
+
+    def test_streamed_text_to_end(self):
+        def handler(request):
+            return httpx.Response(200, content=_sse(_delta("du -sh * "), _delta("| sort -rh")))
+
+        assert _generate(_http_provider(handler)) == "du -sh * | sort -rh"
+
+    def test_api_error_raises_with_message(self):
+        def handler(request):
+            return httpx.Response(401, json={"error": {"message": "Invalid API Key"}})
+
+        with pytest.raises(RuntimeError, match="401: Invalid API Key"):
+            _generate(_http_provider(handler))
@@ -0,0 +1,106 @@
+"""Tests for the on-disk LLM response cache."""
+
+import json
+import time
+
+from cli_ai.llm.cache import LLMCache
+
+
+def _key(text: str) -> str:
+    return LLMCache.make_key("m", [{"role": "user", "content": text}], None, 0.3, 2048, False)
+
+
+class TestKey:
+    """Key covers model, messages, tool names and request settings."""
+
+    def test_same_request_same_key(self):
+        assert _key("ls") == _key("ls")
+
+    def test_request_fields_change_key(self):
+        messages = [{"role": "user", "content": "ls"}]
+        base = LLMCache.make_key("m", messages, None, 0.3, 2048, False)
+
+        assert LLMCache.make_key("other", messages, None, 0.3, 2048, False) != base
+        assert LLMCache.make_key("m", messages, None, 0.0, 2048, False) != base
+        assert LLMCache.make_key("m", messages, [{"name": "read_file"}], 0.3, 2048, False) != base
+        assert LLMCache.make_key("m", messages, None, 0.3, 256, False) != base
+        assert LLMCache.make_key("m", messages, None, 0.3, 2048, True) != base
+        assert _key("pwd") != base
+
+    def test_tool_order_ignored(self):
+        messages = [{"role": "user", "content": "ls"}]
+        a = LLMCache.make_key("m", messages, [{"name": "a"}, {"name": "b"}], 0.3, 2048, False)
+        b = LLMCache.make_key("m", messages, [{"name": "b"}, {"name": "a"}], 0.3, 2048, False)
+        assert a == b
+
+
+class TestGetSet:
+    """Values round-trip through memory and disk."""
+
+    def test_miss_returns_none(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "cache.json")
+        assert cache.get(_key("ls")) is None
+
+    def test_hit_after_set(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "cache.json")
+        cache.set(_key("ls"), "ls -la")
+        assert cache.get(_key("ls")) == "ls -la"
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "cache.json"
+        value = {"text_content": "", "tool_calls": [{"id": "1", "name": "read_file", "input": {}}]}
+        LLMCache(path=path).set(_key("ls"), value)
+
+        assert LLMCache(path=path).get(_key("ls")) == value
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text("{not json")
+        cache = LLMCache(path=path)
+
+        assert cache.get(_key("ls")) is None
+        cache.set(_key("ls"), "ls")
+        assert json.loads(path.read_text())
+
+    def test_no_temp_files_left(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "cache.json")
+        cache.set(_key("ls"), "ls")
+        cache.set(_key("pwd"), "pwd")
+
+        assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
+
+
+class TestEviction:
+    """Entries expire after the TTL and the cache is LRU-capped."""
+
+    def test_expired_entry_is_miss(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "cache.json", ttl=60)
+        cache.set(_key("ls"), "ls")
+        cache._entries[_key("ls")]["ts"] = time.time() - 120
+
+        assert cache.get(_key("ls")) is None
+        assert _key("ls") not in json.loads(cache.path.read_text())
+
+    def test_lru_cap(self, tmp_path):
+        cache = LLMCache(path=tmp_path / "cache.json", max_entries=2)
+        cache.set(_key("a"), "a")
+        cache.set(_key("b"), "b")
+        cache.get(_key("a"))  # "b" is now least recently used
+        cache.set(_key("c"), "c")
+
+        assert cache.get(_key("a")) == "a"
+        assert cache.get(_key("b")) is None
+        assert cache.get(_key("c")) == "c"
+
+    def test_lru_order_persists(self, tmp_path):
+        path = tmp_path / "cache.json"
+        cache = LLMCache(path=path, max_entries=2)
+        cache.set(_key("a"), "a")
+        cache.set(_key("b"), "b")
+        cache.get(_key("a"))  # "b" is now least recently used, on disk too
+
+        reloaded = LLMCache(path=path, max_entries=2)
+        reloaded.set(_key("c"), "c")
+
+        assert reloaded.get(_key("a")) == "a"
+        assert reloaded.get(_key("b")) is None
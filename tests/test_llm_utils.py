@@ -0,0 +1,183 @@
+"""Tests for LLM utility functions."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from cli_ai.llm import utils
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request):
+    """Run a test with and without orjson."""
+    if request.param == "orjson":
+        if utils.orjson is None:
+            pytest.skip("orjson not installed")
+        yield
+    else:
+        with patch.object(utils, "orjson", None):
+            yield
+
+
+class TestJsonLoads:
+    """json_loads accepts exactly what stdlib json.loads accepts."""
+
+    @pytest.mark.parametrize("text", [
+        '{"end": 99999999999999999999}',
+        '[-99999999999999999999, 18446744073709551616]',
+        '{"id": 1700000000, "s": "x"}',
+        '{"s": "12345678901234567890123"}',
+    ])
+    def test_matches_stdlib(self, json_backend, text):
+        assert utils.json_loads(text) == json.loads(text)
+        assert utils.json_loads(text.encode()) == json.loads(text)
+
+    def test_big_int_stays_int(self, json_backend):
+        assert utils.json_loads('{"end": 99999999999999999999}')["end"] == 99999999999999999999
+
+    @pytest.mark.parametrize("text", ["NaN", "1e400", "[Infinity]"])
+    def test_stdlib_only_literals(self, json_backend, text):
+        assert repr(utils.json_loads(text)) == repr(json.loads(text))
+
+    def test_invalid_raises_value_error(self, json_backend):
+        with pytest.raises(ValueError):
+            utils.json_loads("{bad")
+
+
+class TestJsonDumps:
+    """json_dumps matches stdlib semantics with either backend."""
+
+    def test_round_trip(self, json_backend):
+        data = {"path": "src/é.py", "depth": 2, "flags": [True, None]}
+        assert json.loads(utils.json_dumps(data)) == data
+
+    def test_indent(self, json_backend):
+        text = utils.json_dumps({"a": [1]}, indent=True)
+        assert text.splitlines()[1].startswith('  "a"')
+
+    def test_unserializable_uses_str(self, json_backend):
+        assert json.loads(utils.json_dumps({"p": object})) == {"p": str(object)}
+
+    def test_big_int_falls_back(self, json_backend):
+        assert json.loads(utils.json_dumps({"n": 2**70})) == {"n": 2**70}
+
+
+class TestExtractJson:
+    """JSON is recovered from bare text, code blocks and surrounding prose."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ('{"a": 1}', {"a": 1}),
+        ('```json\n{"a": 1}\n```', {"a": 1}),
+        ('```\nnot json\n```\n```json\n[1, 2]\n```', [1, 2]),
+        ('Here you go: {"a": {"b": 2}} done', {"a": {"b": 2}}),
+        ('The list is [1, 2, 3].', [1, 2, 3]),
+        ('first {"a": 1} then {"b": [1, 2]}', {"b": [1, 2]}),
+        ('braces in strings: {"s": "}{ \\" ]"}', {"s": '}{ " ]'}),
+        ('a "quoted" word, then {"a": 1}', {"a": 1}),
+        ('{"end": 99999999999999999999}', {"end": 99999999999999999999}),
+    ])
+    def test_extracts(self, json_backend, text, expected):
+        assert utils.extract_json(text) == expected
+
+    def test_empty_text(self):
+        assert utils.extract_json("") == {}
+
+    def test_no_json_returns_text(self):
+        assert utils.extract_json("ls -la") == "ls -la"
+
+    def test_balanced_scan_is_linear_on_unclosed_input(self):
+        # Many unmatched openers used to drive the greedy regexes quadratic
+        text = "{[" * 50_000
+        assert utils.extract_json(text) == text
+
+    def test_find_balanced_spans(self):
+        assert utils._find_balanced('x {"a": {}} y {} }', "{", "}") == ['{"a": {}}', "{}"]
+
+
+class TestParseOpenaiToolCalls:
+    """Tool call arguments are decoded with either JSON backend."""
+
+    def test_parses_arguments(self, json_backend):
+        calls = [{"id": "1", "function": {"name": "read_file", "arguments": '{"path": "a"}'}}]
+
+        assert utils.parse_openai_tool_calls(calls) == [
+            {"id": "1", "name": "read_file", "input": {"path": "a"}},
+        ]
+
+    def test_invalid_arguments_kept_as_string(self, json_backend):
+        calls = [{"id": "1", "function": {"name": "read_file", "arguments": "{bad"}}]
+
+        assert utils.parse_openai_tool_calls(calls)[0]["input"] == "{bad"
+
+    def test_decoded_arguments_and_missing_function(self, json_backend):
+        calls = [
+            {"id": "1", "function": {"name": "list_directory", "arguments": {"path": "."}}},
+            {"id": "2"},
+        ]
+
+        assert utils.parse_openai_tool_calls(calls) == [
+            {"id": "1", "name": "list_directory", "input": {"path": "."}},
+            {"id": "2", "name": None, "input": None},
+        ]
+
+
+class TestConvertToStandardMessages:
+    """The system prompt is prepended only when no system message exists."""
+
+    def test_prepends_system_prompt(self):
+        result = utils.convert_to_standard_messages(
+            [{"role": "user", "content": "hi"}, "junk"], system_prompt="sys"
+        )
+
+        assert result == [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "hi"},
+        ]
+
+    def test_existing_system_message_wins(self):
+        messages = [
+            {"role": "user", "content": "hi"},
+            {"role": "system", "content": "mine"},
+        ]
+
+        assert utils.convert_to_standard_messages(messages, system_prompt="sys") == messages
+
+    def test_string_becomes_user_message(self):
+        assert utils.convert_to_standard_messages("hi", system_prompt="sys") == [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "hi"},
+        ]
+
+
+class TestExtractTextFromContent:
+    """Text parts are joined with spaces; other parts are ignored."""
+
+    @pytest.mark.parametrize("content, expected", [
+        ("plain", "plain"),
+        ([{"type": "text", "text": "one"}], "one"),
+        ([{"type": "image_url", "image_url": {}}], ""),
+        ([{"type": "text", "text": "a"}, {"type": "image_url"}, {"type": "text", "text": "b"}], "a b"),
+        ([], ""),
+        (None, "None"),
+    ])
+    def test_extract(self, content, expected):
+        assert utils.extract_text_from_content(content) == expected
+
+
+class TestValidateToolsFormat:
+    """Tools need a name and description; input_schema must be a dict."""
+
+    def test_tool_schemas_are_valid(self):
+        from cli_ai.tools import TOOL_SCHEMAS
+
+        assert utils.validate_tools_format(TOOL_SCHEMAS) is True
+
+    @pytest.mark.parametrize("tools", [
+        "read_file",
+        ["read_file"],
+        [{"name": "x"}],
+        [{"name": "x", "description": "", "input_schema": []}],
+    ])
+    def test_invalid(self, tools):
+        assert utils.validate_tools_format(tools) is False
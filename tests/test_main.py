@@ -0,0 +1,103 @@
+"""Tests for the CLI entrypoint's event loop handling."""
+
+import asyncio
+import io
+import json
+
+import pytest
+
+from cli_ai import agent, main
+from cli_ai.llm import manager as manager_module
+
+
+@pytest.fixture
+def shutdown_calls(monkeypatch):
+    calls = []
+
+    async def shutdown_manager():
+        calls.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(manager_module, "shutdown_manager", shutdown_manager)
+    return calls
+
+
+def _run_main(monkeypatch, process_query) -> int:
+    monkeypatch.setattr(agent, "process_query", process_query)
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps({"query": "list files"})))
+    with pytest.raises(SystemExit) as exc:
+        main.main()
+    return exc.value.code
+
+
+class TestEventLoop:
+    """The loop is always cleaned up and closed, including on Ctrl-C."""
+
+    def test_success_prints_command(self, monkeypatch, capsys, shutdown_calls):
+        async def process_query(**kwargs):
+            return "ls -la"
+
+        assert _run_main(monkeypatch, process_query) == 0
+        assert capsys.readouterr().out == "ls -la"
+        assert len(shutdown_calls) == 1
+        assert shutdown_calls[0].is_closed()
+
+    def test_keyboard_interrupt_cancels_tasks_and_shuts_down(self, monkeypatch, shutdown_calls):
+        background = []
+
+        async def process_query(**kwargs):
+            background.append(asyncio.ensure_future(asyncio.sleep(60)))
+            await asyncio.sleep(0)
+            raise KeyboardInterrupt
+
+        assert _run_main(monkeypatch, process_query) == 1
+        assert background[0].cancelled()
+        assert len(shutdown_calls) == 1
+        assert shutdown_calls[0].is_closed()
+
+
+class _RecordingProvider:
+    def __init__(self):
+        self.closed = False
+
+    async def cleanup(self):
+        self.closed = True
+
+
+class TestRealManagerShutdown:
+    """With debug logging on, the real manager flushes and closes on exit."""
+
+    @pytest.fixture
+    def debug_log(self, monkeypatch, tmp_path):
+        log_file = tmp_path / "debug.log"
+        monkeypatch.setattr(manager_module, "_DEBUG", True)
+        monkeypatch.setattr(manager_module, "_DEBUG_LOG_DIR", tmp_path)
+        monkeypatch.setattr(manager_module, "_DEBUG_LOG_FILE", log_file)
+        monkeypatch.setattr(manager_module, "_manager", None)
+        return log_file
+
+    def _query(self, provider, interrupt=False):
+        async def process_query(**kwargs):
+            manager = await manager_module.get_manager()
+            manager.providers = {"fake": provider}
+            manager._debug_log("QUERY", lambda: "payload")
+            if interrupt:
+                raise KeyboardInterrupt
+            return "ls -la"
+
+        return process_query
+
+    def test_success_flushes_log_and_closes_providers(self, monkeypatch, capsys, debug_log):
+        provider = _RecordingProvider()
+
+        assert _run_main(monkeypatch, self._query(provider)) == 0
+        assert capsys.readouterr().out == "ls -la"
+        assert "] QUERY" in debug_log.read_text()
+        assert provider.closed
+        assert manager_module._manager is None
+
+    def test_keyboard_interrupt_flushes_log_and_closes_providers(self, monkeypatch, debug_log):
+        provider = _RecordingProvider()
+
+        assert _run_main(monkeypatch, self._query(provider, interrupt=True)) == 1
+        assert "] QUERY" in debug_log.read_text()
+        assert provider.closed
@@ -0,0 +1,307 @@
+"""Tests for LLMManager provider setup, tool dispatch and debug logging."""
+
+import asyncio
+from unittest.mock import patch
+
+from cli_ai.llm import manager as manager_module
+from cli_ai.llm.manager import LLMManager
+from cli_ai.llm.provider_factory import LLMType
+
+
+def _manager() -> LLMManager:
+    # Bypass provider setup; only tool dispatch is exercised here
+    return LLMManager.__new__(LLMManager)
+
+
+def _call(id_: str, name: str, **args) -> dict:
+    return {"id": id_, "name": name, "input": args}
+
+
+class _FakeProvider:
+    def __init__(self):
+        self.initialized = 0
+
+    async def initialize(self):
+        self.initialized += 1
+        return True
+
+    async def generate(self, **kwargs):
+        return "ls -la"
+
+    async def cleanup(self):
+        pass
+
+
+class TestLazyProviders:
+    """Providers are built on the first generate() that needs them."""
+
+    def test_provider_built_once_on_first_use(self):
+        built = []
+
+        def factory():
+            built.append(_FakeProvider())
+            return built[-1]
+
+        async def run():
+            manager = LLMManager()
+            manager._factories = {LLMType.GROQ: factory}
+            await manager.initialize()
+            assert built == []
+            first = await manager.generate([{"role": "user", "content": "x"}])
+            second = await manager.generate([{"role": "user", "content": "y"}])
+            return first, second
+
+        assert asyncio.run(run()) == ("ls -la", "ls -la")
+        assert len(built) == 1
+        assert built[0].initialized == 1
+
+    def test_unconfigured_provider_reports_error(self):
+        async def run():
+            manager = LLMManager()
+            manager._factories = {}
+            return await manager.generate([{"role": "user", "content": "x"}])
+
+        assert asyncio.run(run()) == "# Error: groq provider not available"
+
+
+class TestMaxIterations:
+    """After max_iterations tool rounds, a final request answers without tools."""
+
+    def _run(self, max_iterations, provider_cls):
+        handled = []
+
+        async def handler(name, args):
+            handled.append(name)
+            return "contents"
+
+        async def run():
+            manager = LLMManager()
+            manager._factories = {LLMType.GROQ: provider_cls}
+            return await manager.generate(
+                [{"role": "user", "content": "x"}],
+                tools=[{"name": "read_file", "description": ""}],
+                tool_handler=handler,
+                max_iterations=max_iterations,
+            )
+
+        return asyncio.run(run()), handled
+
+    def _tool_happy_provider(self, calls):
+        class ToolHappyProvider(_FakeProvider):
+            async def generate(self, **kwargs):
+                calls.append({**kwargs, "messages": list(kwargs["messages"])})
+                if kwargs["tools"]:
+                    return {"text_content": "", "tool_calls": [
+                        {"id": str(len(calls)), "name": "read_file", "input": {"path": str(len(calls))}},
+                    ]}
+                return "make run"
+
+        return ToolHappyProvider
+
+    def test_final_request_after_all_tool_rounds(self):
+        calls = []
+        result, handled = self._run(3, self._tool_happy_provider(calls))
+
+        assert result == "make run"
+        assert [bool(c["tools"]) for c in calls] == [True, True, True, False]
+        assert all("final_turn" not in c for c in calls)
+        assert handled == ["read_file"] * 3
+
+    def test_final_request_sends_no_tools_and_nudges(self):
+        calls = []
+        result, handled = self._run(1, self._tool_happy_provider(calls))
+
+        assert result == "make run"
+        assert handled == ["read_file"]
+        final = calls[-1]
+        assert final["tools"] is None
+        assert final["messages"][-1] == {
+            "role": "user", "content": manager_module.FINAL_ANSWER_NUDGE,
+        }
+        assert all(m["role"] != "user" or m["content"] == "x" for m in calls[0]["messages"])
+
+    def test_tool_calls_on_final_request_return_text(self):
+        class StubbornProvider(_FakeProvider):
+            async def generate(self, **kwargs):
+                return {"text_content": "ls -la", "tool_calls": [
+                    {"id": "1", "name": "read_file", "input": {"path": "x"}},
+                ]}
+
+        result, handled = self._run(1, StubbornProvider)
+
+        assert result == "ls -la"
+        assert handled == ["read_file"]
+
+    def test_no_final_request_without_tool_calls(self):
+        calls = []
+
+        class RecordingProvider(_FakeProvider):
+            async def generate(self, **kwargs):
+                calls.append(kwargs)
+                return "ls"
+
+        async def run():
+            manager = LLMManager()
+            manager._factories = {LLMType.GROQ: RecordingProvider}
+            return await manager.generate([{"role": "user", "content": "x"}], max_iterations=1)
+
+        assert asyncio.run(run()) == "ls"
+        assert len(calls) == 1
+        assert calls[0]["tools"] is None
+
+
+class TestRunTools:
+    """Tool calls within a round run concurrently, results keep order."""
+
+    def test_results_keep_tool_call_order(self):
+        async def handler(name, args):
+            await asyncio.sleep(args["delay"])
+            return name
+
+        calls = [
+            _call("a", "slow", delay=0.03),
+            _call("b", "fast", delay=0.0),
+        ]
+        results = asyncio.run(_manager()._run_tools(calls, handler))
+
+        assert [r["tool_call_id"] for r in results] == ["a", "b"]
+        assert [r["content"] for r in results] == ["slow", "fast"]
+        assert all(r["role"] == "tool" for r in results)
+
+    def test_tools_overlap(self):
+        running = 0
+        peak = 0
+
+        async def handler(name, args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        calls = [_call(str(i), "read_file", path=str(i)) for i in range(3)]
+        asyncio.run(_manager()._run_tools(calls, handler))
+
+        assert peak == 3
+
+    def test_identical_calls_run_once(self):
+        handled = []
+
+        async def handler(name, args):
+            handled.append((name, args))
+            return "contents"
+
+        calls = [
+            {"id": "a", "name": "read_file", "input": {"path": "x", "start": 1}},
+            {"id": "b", "name": "read_file", "input": {"start": 1, "path": "x"}},
+            _call("c", "read_file", path="y"),
+        ]
+        results = asyncio.run(_manager()._run_tools(calls, handler))
+
+        assert len(handled) == 2
+        assert [r["tool_call_id"] for r in results] == ["a", "b", "c"]
+        assert all(r["content"] == "contents" for r in results)
+
+    def test_side_effect_calls_not_deduplicated(self):
+        handled = []
+
+        async def handler(name, args):
+            handled.append(name)
+            return "ok"
+
+        calls = [_call(str(i), "shell_exec", command="date") for i in range(2)]
+        asyncio.run(_manager()._run_tools(calls, handler))
+
+        assert handled == ["shell_exec", "shell_exec"]
+
+    def test_serialize_marker_runs_one_at_a_time(self):
+        running = 0
+        peak = 0
+
+        async def handler(name, args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        tools = [{"name": "locked", "description": "", "serialize": True}]
+        calls = [_call(str(i), "locked") for i in range(3)]
+        asyncio.run(_manager()._run_tools(calls, handler, tools))
+
+        assert peak == 1
+
+    def test_errors_become_tool_messages(self):
+        async def handler(name, args):
+            raise RuntimeError("boom")
+
+        results = asyncio.run(_manager()._run_tools([_call("x", "read_file")], handler))
+
+        assert results == [{"role": "tool", "tool_call_id": "x", "content": "Error: boom"}]
+
+
+class TestDebugLog:
+    """Debug entries are queued and written by a background task."""
+
+    def test_entries_written_in_order_on_cleanup(self, tmp_path):
+        log_file = tmp_path / "debug.log"
+
+        async def run():
+            manager = LLMManager()
+            manager.providers = {}
+            await manager.initialize()
+            manager._debug_log("FIRST", lambda: {"messages": [{"role": "user", "content": "hi"}]})
+            manager._debug_log("SECOND", lambda: "plain text")
+            await manager.cleanup()
+
+        with patch.object(manager_module, "_DEBUG", True), \
+                patch.object(manager_module, "_DEBUG_LOG_DIR", tmp_path), \
+                patch.object(manager_module, "_DEBUG_LOG_FILE", log_file):
+            asyncio.run(run())
+
+        text = log_file.read_text()
+        assert text.index("] FIRST") < text.index("] SECOND")
+        assert '"content": "hi"' in text
+        assert "plain text" in text
+
+    def test_cleanup_tolerates_cancelled_writer(self, tmp_path):
+        closed = []
+
+        class Provider(_FakeProvider):
+            async def cleanup(self):
+                closed.append(True)
+
+        async def run():
+            manager = LLMManager()
+            manager.providers = {LLMType.GROQ: Provider()}
+            await manager.initialize()
+            manager._log_task.cancel()
+            await asyncio.sleep(0)
+            await manager.cleanup()
+
+        with patch.object(manager_module, "_DEBUG", True), \
+                patch.object(manager_module, "_DEBUG_LOG_DIR", tmp_path), \
+                patch.object(manager_module, "_DEBUG_LOG_FILE", tmp_path / "debug.log"):
+            asyncio.run(run())
+
+        assert closed == [True]
+
+    def test_disabled_debug_writes_nothing(self, tmp_path):
+        log_file = tmp_path / "debug.log"
+        built = []
+
+        async def run():
+            manager = LLMManager()
+            manager.providers = {}
+            await manager.initialize()
+            manager._debug_log("FIRST", lambda: built.append("payload"))
+            await manager.cleanup()
+
+        with patch.object(manager_module, "_DEBUG", False), \
+                patch.object(manager_module, "_DEBUG_LOG_FILE", log_file):
+            asyncio.run(run())
+
+        assert not log_file.exists()
+        assert built == []
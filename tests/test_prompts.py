@@ -0,0 +1,21 @@
+"""Tests for system prompt construction."""
+
+from cli_ai import prompts
+
+
+class TestBuildSystemPrompt:
+    """The pre-parsed template renders exactly like str.format."""
+
+    def test_matches_format(self):
+        result = prompts.build_system_prompt("/tmp/x", history="  ls\ncd ..  ", shell="bash", os_info="darwin")
+
+        assert result == prompts.SYSTEM_PROMPT.format(
+            cwd="/tmp/x", shell="bash", os="darwin", history="ls\ncd ..",
+        )
+
+    def test_empty_history_placeholder(self):
+        result = prompts.build_system_prompt("/tmp/x")
+
+        assert result.endswith("Recent terminal history:\n(no recent history)")
+        assert "- Shell: zsh\n" in result
+        assert "\\ continuations" in result
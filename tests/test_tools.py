@@ -0,0 +1,297 @@
+"""Tests for the read-only filesystem tools."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from cli_ai import tools
+
+
+def _grep(*args, **kwargs):
+    return asyncio.run(tools.grep_files(*args, **kwargs))
+
+
+def _write_lines(path, count):
+    path.write_text("".join(f"line {i}\n" for i in range(1, count + 1)))
+
+
+class TestResolveSafePath:
+    """Paths resolve inside the working directory or are rejected."""
+
+    def test_relative_path(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        assert tools._resolve_safe_path("sub/../sub", str(tmp_path)) == (tmp_path / "sub").resolve()
+
+    def test_cwd_itself(self, tmp_path):
+        assert tools._resolve_safe_path(".", str(tmp_path)) == tmp_path.resolve()
+
+    @pytest.mark.parametrize("path", ["..", "../x", "/etc/passwd"])
+    def test_escape_blocked(self, tmp_path, path):
+        with pytest.raises(ValueError, match="Path traversal blocked"):
+            tools._resolve_safe_path(path, str(tmp_path))
+
+    def test_sibling_with_same_prefix_blocked(self, tmp_path):
+        # /x/foo must not admit /x/foobar just because the string starts the same
+        (tmp_path / "foo").mkdir()
+        (tmp_path / "foobar").mkdir()
+        (tmp_path / "foobar" / "secret").write_text("s")
+
+        with pytest.raises(ValueError):
+            tools._resolve_safe_path("../foobar/secret", str(tmp_path / "foo"))
+
+    def test_symlink_out_of_cwd_blocked(self, tmp_path):
+        (tmp_path / "cwd").mkdir()
+        (tmp_path / "cwd" / "out").symlink_to(tmp_path)
+
+        with pytest.raises(ValueError):
+            tools._resolve_safe_path("out/file", str(tmp_path / "cwd"))
+
+
+class TestReadFile:
+    """read_file returns up to MAX_FILE_LINES lines with a truncation banner."""
+
+    def test_small_file(self, tmp_path):
+        (tmp_path / "a.txt").write_text("one\ntwo\n")
+        assert tools.read_file("a.txt", str(tmp_path)) == "one\ntwo"
+
+    def test_truncated_file_reports_total(self, tmp_path):
+        _write_lines(tmp_path / "big.txt", 25)
+        with patch.object(tools, "MAX_FILE_LINES", 10):
+            result = tools.read_file("big.txt", str(tmp_path))
+
+        content, banner = result.split("\n\n")
+        assert content.splitlines() == [f"line {i}" for i in range(1, 11)]
+        assert banner == "[Truncated: showing 10/25 lines]"
+
+    def test_exactly_max_lines_not_truncated(self, tmp_path):
+        _write_lines(tmp_path / "f.txt", 10)
+        with patch.object(tools, "MAX_FILE_LINES", 10):
+            result = tools.read_file("f.txt", str(tmp_path))
+
+        assert "Truncated" not in result
+        assert result.splitlines()[-1] == "line 10"
+
+    def test_missing_file(self, tmp_path):
+        assert tools.read_file("nope.txt", str(tmp_path)) == "Error: File not found: nope.txt"
+
+
+class TestReadLines:
+    """read_lines returns a numbered window and the file's total line count."""
+
+    def test_window(self, tmp_path):
+        _write_lines(tmp_path / "f.txt", 20)
+        result = tools.read_lines("f.txt", 3, 5, str(tmp_path))
+
+        assert result == "Lines 3-5 of 20:\n3: line 3\n4: line 4\n5: line 5"
+
+    def test_end_clamped_to_length(self, tmp_path):
+        _write_lines(tmp_path / "f.txt", 4)
+        result = tools.read_lines("f.txt", 3, 99, str(tmp_path))
+
+        assert result == "Lines 3-4 of 4:\n3: line 3\n4: line 4"
+
+    def test_start_past_end_of_file(self, tmp_path):
+        _write_lines(tmp_path / "f.txt", 4)
+        result = tools.read_lines("f.txt", 10, 12, str(tmp_path))
+
+        assert result == "Error: Start line 10 exceeds file length (4 lines)"
+
+
+class TestBinaryDetection:
+    """Binary sniffing is memoized per (path, mtime, size)."""
+
+    def test_detects_nul_bytes(self, tmp_path):
+        (tmp_path / "bin").write_bytes(b"abc\x00def")
+        (tmp_path / "text").write_text("abc")
+
+        assert tools._is_binary(tmp_path / "bin") is True
+        assert tools._is_binary(tmp_path / "text") is False
+
+    def test_rewritten_file_is_sniffed_again(self, tmp_path):
+        target = tmp_path / "f"
+        target.write_text("text")
+        assert tools._is_binary(target) is False
+
+        target.write_bytes(b"now\x00binary")
+        assert tools._is_binary(target) is True
+
+    def test_known_text_extension_not_opened(self, tmp_path):
+        target = tmp_path / "notes.MD"
+        target.write_bytes(b"odd\x00bytes")
+
+        with patch("builtins.open", side_effect=AssertionError("opened")):
+            assert tools._is_binary(target) is False
+
+    def test_missing_file_treated_as_binary(self, tmp_path):
+        assert tools._is_binary(tmp_path / "missing") is True
+
+
+class TestGrepFiles:
+    """grep_files reports path:line matches and skips binary or large files."""
+
+    def test_matches_with_line_numbers(self, tmp_path):
+        (tmp_path / "a.py").write_text("import os\nPRINT('hi')\n")
+        result = _grep("print", ".", str(tmp_path))
+
+        assert result == "a.py:2: PRINT('hi')"
+
+    def test_case_sensitive(self, tmp_path):
+        (tmp_path / "a.txt").write_text("Needle\nneedle\n")
+        result = _grep("Needle", ".", str(tmp_path), ignore_case=False)
+
+        assert result == "a.txt:1: Needle"
+
+    def test_skips_binary_and_oversized_files(self, tmp_path):
+        (tmp_path / "bin.dat").write_bytes(b"needle\x00")
+        (tmp_path / "big.txt").write_text("needle\n" + "x" * tools.MAX_FILE_SIZE)
+        (tmp_path / "ok.txt").write_text("needle\n")
+        result = _grep("needle", ".", str(tmp_path))
+
+        assert result == "ok.txt:1: needle"
+
+    def test_walk_order_and_pruning(self, tmp_path):
+        for rel in ("b.txt", "a.txt", "a/z.txt", "a/sub/y.txt", ".hidden/x.txt",
+                    "node_modules/m.js", "pkg/__pycache__/c.txt"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("needle\n")
+        (tmp_path / "link").symlink_to(tmp_path / "a")
+
+        result = _grep("needle", ".", str(tmp_path))
+
+        assert [line.split(":")[0] for line in result.splitlines()] == [
+            "a/sub/y.txt", "a/z.txt", "a.txt", "b.txt",
+        ]
+
+    def test_order_and_caps_across_batches(self, tmp_path):
+        for i in range(12):
+            (tmp_path / f"f{i:02}.txt").write_text("needle\n" * 3)
+        (tmp_path / "f03.txt").write_bytes(b"needle\x00")
+
+        with patch.object(tools, "GREP_BATCH_SIZE", 5), \
+                patch.object(tools, "MAX_SEARCH_RESULTS", 8):
+            result = _grep("needle", ".", str(tmp_path))
+
+        lines = result.split("\n\n")[0].splitlines()
+        assert [line.split(":")[0] for line in lines] == [
+            "f00.txt", "f00.txt", "f00.txt",
+            "f01.txt", "f01.txt", "f01.txt",
+            "f02.txt", "f02.txt",
+        ]
+        assert result.endswith("[Truncated: showing first 8 matches]")
+
+    def test_batches_stop_at_file_cap(self, tmp_path):
+        for i in range(10):
+            (tmp_path / f"f{i}.txt").write_text("nothing\n")
+        read = []
+        real_grep_file = tools._grep_file
+
+        def recording_grep_file(file_path, *args):
+            read.append(file_path)
+            return real_grep_file(file_path, *args)
+
+        with patch.object(tools, "GREP_BATCH_SIZE", 4), \
+                patch.object(tools, "GREP_MAX_FILES", 6), \
+                patch.object(tools, "_grep_file", recording_grep_file):
+            result = _grep("needle", ".", str(tmp_path))
+
+        assert len(read) == 6
+        assert result == "No matches for 'needle' in . (6 files searched)"
+
+    def test_dispatched_through_execute_tool(self, tmp_path):
+        (tmp_path / "a.txt").write_text("needle\n")
+        result = asyncio.run(tools.execute_tool("grep_files", {"pattern": "needle"}, str(tmp_path)))
+
+        assert result == "a.txt:1: needle"
+
+    def test_no_matches(self, tmp_path):
+        (tmp_path / "a.txt").write_text("nothing here\n")
+        result = _grep("needle", ".", str(tmp_path))
+
+        assert result == "No matches for 'needle' in . (1 files searched)"
+
+
+class TestListDirectory:
+    """list_directory shows directories first, then files with sizes."""
+
+    def test_listing(self, tmp_path):
+        (tmp_path / "src" / "pkg").mkdir(parents=True)
+        (tmp_path / "src" / "main.py").write_text("x" * 10)
+        (tmp_path / "README.md").write_text("x" * 2048)
+        (tmp_path / ".env").write_text("SECRET=1")
+        (tmp_path / "__pycache__").mkdir()
+
+        result = tools.list_directory(".", str(tmp_path), depth=2)
+
+        assert result.splitlines() == [
+            "src/",
+            "  pkg/",
+            "  main.py  (10B)",
+            "README.md  (2KB)",
+        ]
+
+    def test_empty_directory(self, tmp_path):
+        assert tools.list_directory(".", str(tmp_path)) == "(empty directory)"
+
+
+class TestSearchFiles:
+    """search_files matches names at any depth and prunes noise directories."""
+
+    def _tree(self, root):
+        for rel in ("setup.py", "src/app/main.py", "src/app/util.txt",
+                    "node_modules/dep/index.py", ".venv/lib/site.py"):
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_text("")
+
+    def test_name_pattern(self, tmp_path):
+        self._tree(tmp_path)
+        result = tools.search_files("*.py", ".", str(tmp_path))
+
+        assert result.splitlines() == ["setup.py", "src/app/main.py"]
+
+    def test_pattern_with_directory(self, tmp_path):
+        self._tree(tmp_path)
+
+        assert tools.search_files("app/*.txt", ".", str(tmp_path)) == "src/app/util.txt"
+        assert tools.search_files("**/main.py", ".", str(tmp_path)) == "src/app/main.py"
+
+    def _nested_tree(self, root):
+        for rel in ("src/main.py", "src/app/deep.py", "src/sub/x.py",
+                    "src/sub/inner/y.py", "lib/src/z.py", "src/README.md"):
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_text("")
+
+    def test_star_does_not_cross_directories(self, tmp_path):
+        self._nested_tree(tmp_path)
+        result = tools.search_files("src/*.py", ".", str(tmp_path))
+
+        assert result.splitlines() == ["lib/src/z.py", "src/main.py"]
+
+    def test_double_star_spans_zero_or_more_directories(self, tmp_path):
+        self._nested_tree(tmp_path)
+        result = tools.search_files("src/**/*.py", ".", str(tmp_path))
+
+        assert result.splitlines() == [
+            "lib/src/z.py",
+            "src/app/deep.py",
+            "src/main.py",
+            "src/sub/inner/y.py",
+            "src/sub/x.py",
+        ]
+
+    def test_no_match_reports_original_pattern(self, tmp_path):
+        self._nested_tree(tmp_path)
+        result = tools.search_files("**/*.rs", ".", str(tmp_path))
+
+        assert result == "No files matching '**/*.rs' found in ."
+
+    def test_matches_directories(self, tmp_path):
+        self._tree(tmp_path)
+
+        assert tools.search_files("app", ".", str(tmp_path)) == "src/app"
+
+    def test_no_match(self, tmp_path):
+        self._tree(tmp_path)
+        result = tools.search_files("*.rs", ".", str(tmp_path))
+
+        assert result == "No files matching '*.rs' found in ."